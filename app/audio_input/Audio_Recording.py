@@ -2,6 +2,8 @@ import pyaudio
 import wave
 import threading
 import shutil
+import os
+from dataclasses import dataclass
 from datetime import datetime
 
 import sys
@@ -11,8 +13,73 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))  # Adds project root t
 from utils.logger import logger
 from utils.paths import AUDIO_FILES_DIR, TEMP_DIR, LOG_FILE
 
+CHUNK_FRAMES = 1024
+RING_SECONDS = 10          # audio the writer thread may fall behind by before chunks are dropped
+
+
+@dataclass(frozen=True)
+class CaptureProfile:
+    """Sample format written to disk. 16 kHz mono matches Whisper, so no resampling is needed later."""
+    rate: int = 16000
+    channels: int = 1
+    chunk_frames: int = CHUNK_FRAMES
+
+
+WHISPER_PROFILE = CaptureProfile()
+HIGH_QUALITY_PROFILE = CaptureProfile(rate=44100)
+
+
+class PCMRingBuffer:
+    """Fixed-capacity byte ring shared by the capture thread (writer) and the disk writer (reader)."""
+
+    def __init__(self, capacity_bytes: int):
+        self.capacity = capacity_bytes
+        self._buf = bytearray(capacity_bytes)
+        self._read_pos = 0
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.overflows = 0
+
+    def write(self, data: bytes) -> bool:
+        with self._cond:
+            if self._size + len(data) > self.capacity:
+                self.overflows += 1
+                return False
+            write_pos = (self._read_pos + self._size) % self.capacity
+            first = min(len(data), self.capacity - write_pos)
+            self._buf[write_pos:write_pos + first] = data[:first]
+            self._buf[:len(data) - first] = data[first:]
+            self._size += len(data)
+            self._cond.notify()
+            return True
+
+    def read(self, max_bytes: int, timeout: float = 0.5) -> bytes:
+        """Block until data is available (or the ring is closed) and return up to ``max_bytes``."""
+        with self._cond:
+            if not self._size and not self._closed:
+                self._cond.wait(timeout)
+            n = min(max_bytes, self._size)
+            first = min(n, self.capacity - self._read_pos)
+            out = bytes(self._buf[self._read_pos:self._read_pos + first]) + bytes(self._buf[:n - first])
+            self._read_pos = (self._read_pos + n) % self.capacity
+            self._size -= n
+            return out
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def drained(self) -> bool:
+        with self._cond:
+            return self._closed and not self._size
+
+
 class AudioInputManager:
-    def __init__(self, base_directory: Path = None):
+    def __init__(self, base_directory: Path = None, streaming: bool = True,
+                 profile: CaptureProfile = WHISPER_PROFILE):
         self.base_directory = base_directory or AUDIO_FILES_DIR
         self.base_directory.mkdir(parents=True, exist_ok=True)
 
@@ -21,23 +88,72 @@ class AudioInputManager:
         self.frames = []
         self.recording = False
         self.filepath = None
+        # Streaming mode writes PCM to disk while recording instead of keeping frames in memory
+        self.streaming = streaming
+        self.ring = None
+        self.writer_thread = None
+        self.frames_written = 0
+        self.profile = profile
+        self.device_rate = profile.rate     # actual capture rate; differs when the device can't do profile.rate
+        self.resampler = None
+        # Callbacks receiving each block of profile-rate PCM as it is written (streaming mode only)
+        self.listeners = []
         logger.info(f"AudioInputManager initialized at: {self.base_directory}")
 
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    @property
+    def max_buffered_bytes(self) -> int:
+        """Upper bound on audio held in memory while streaming, independent of recording length."""
+        return self.ring.capacity if self.ring else RING_SECONDS * self.device_rate * self.profile.channels * 2
+
+    @property
+    def overflow_count(self) -> int:
+        return self.ring.overflows if self.ring else 0
+
     def _get_timestamped_filename(self, prefix="audio", ext=".wav"):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         return self.base_directory / f"{prefix}_{timestamp}{ext}"
 
+    def _pick_device_rate(self) -> int:
+        try:
+            self.audio.is_format_supported(self.profile.rate, input_device=self.audio.get_default_input_device_info()["index"],
+                                           input_channels=self.profile.channels, input_format=pyaudio.paInt16)
+            return self.profile.rate
+        except (ValueError, OSError, IOError):
+            native = int(self.audio.get_default_input_device_info()["defaultSampleRate"])
+            logger.info(f"Input device cannot capture at {self.profile.rate} Hz; capturing at {native} Hz and resampling.")
+            return native
+
     def start_recording(self):
         self.frames = []
         try:
+            self.device_rate = self._pick_device_rate()
+            self.resampler = None
+            if self.device_rate != self.profile.rate:
+                if self.profile.channels != 1:
+                    raise ValueError("Resampling during capture is only supported for mono profiles.")
+                from .resample import StreamingResampler
+                self.resampler = StreamingResampler(self.device_rate, self.profile.rate)
             self.stream = self.audio.open(
                 format=pyaudio.paInt16,
-                channels=1,
-                rate=44100,
+                channels=self.profile.channels,
+                rate=self.device_rate,
                 input=True,
 
-                frames_per_buffer=1024,
+                frames_per_buffer=self.profile.chunk_frames,
             )
+            if self.streaming:
+                self.filepath = self._get_timestamped_filename()
+                self.ring = PCMRingBuffer(RING_SECONDS * self.device_rate * self.profile.channels * 2)
+                self.frames_written = 0
+                self.writer_thread = threading.Thread(target=self._write_stream, args=(self.filepath,), daemon=True)
+                self.writer_thread.start()
             self.recording = True
             self.thread = threading.Thread(target=self._record)
             self.thread.start()
@@ -49,13 +165,37 @@ class AudioInputManager:
     def _record(self):
         while self.recording:
             try:
-                data = self.stream.read(1024, exception_on_overflow=False)
-                if data:
+                data = self.stream.read(self.profile.chunk_frames, exception_on_overflow=False)
+                if not data:
+                    continue
+                if self.streaming:
+                    if not self.ring.write(data):
+                        logger.warning(f"Recorder ring buffer full; dropped chunk (overflows: {self.ring.overflows}).")
+                else:
                     self.frames.append(data)
             except Exception as e:
                 logger.error(f"Error during recording: {e}")
                 break
 
+    def _write_stream(self, path):
+        # The wave module rewrites the RIFF/data sizes in the header when the file is closed
+        with wave.open(str(path), "wb") as wf:
+            wf.setnchannels(self.profile.channels)
+            wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
+            wf.setframerate(self.profile.rate)
+            while not self.ring.drained:
+                data = self.ring.read(self.profile.chunk_frames * self.profile.channels * 2 * 16)
+                if data and self.resampler:
+                    data = self.resampler.process(data)
+                if data:
+                    wf.writeframesraw(data)
+                    self.frames_written += len(data) // (2 * self.profile.channels)
+                    for callback in list(self.listeners):
+                        try:
+                            callback(data)
+                        except Exception as e:
+                            logger.error(f"Recorder listener failed: {e}")
+
     def stop_recording(self):
         self.recording = False
         if hasattr(self, 'thread') and self.thread.is_alive():
@@ -64,6 +204,19 @@ class AudioInputManager:
             self.stream.stop_stream()
             self.stream.close()
 
+        if self.streaming:
+            # Only what is still in the ring (bounded by RING_SECONDS) is left to flush
+            self.ring.close()
+            self.writer_thread.join()
+            if self.ring.overflows:
+                logger.warning(f"Recording dropped {self.ring.overflows} chunks due to writer overflow.")
+            if not self.frames_written:
+                logger.warning("No audio frames captured.")
+                self.filepath.unlink(missing_ok=True)
+                return None
+            logger.info(f"Recording saved: {self.filepath.name}")
+            return self.filepath
+
         if not self.frames:
             logger.warning("No audio frames captured.")
             return None
@@ -74,11 +227,15 @@ class AudioInputManager:
         return self.filepath
 
     def _save_wav(self, path):
+        pcm = b"".join(self.frames)
+        if self.device_rate != self.profile.rate:
+            from .resample import resample_pcm
+            pcm = resample_pcm(pcm, self.device_rate, self.profile.rate)
         with wave.open(str(path), "wb") as wf:
-            wf.setnchannels(1)
+            wf.setnchannels(self.profile.channels)
             wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-            wf.setframerate(44100)
-            wf.writeframes(b"".join(self.frames))
+            wf.setframerate(self.profile.rate)
+            wf.writeframes(pcm)
 
     def accept_pre_recorded_file(self, input_path):
         input_path = Path(input_path)
@@ -87,8 +244,13 @@ class AudioInputManager:
             return None
 
         dest_path = self._get_timestamped_filename(prefix="prerecorded")
-        shutil.copy(input_path, dest_path)
-        logger.info(f"Pre-recorded file copied: {dest_path.name}")
+        try:
+            # Same filesystem (e.g. re-registering a file from audio_files/): share the inode instead of copying
+            os.link(input_path, dest_path)
+            logger.info(f"Pre-recorded file linked: {dest_path.name}")
+        except OSError:
+            shutil.copy(input_path, dest_path)
+            logger.info(f"Pre-recorded file copied: {dest_path.name}")
         return dest_path
 
     def cleanup(self):
@@ -1,5 +1,6 @@
 import os
 import json
+import time
 from pathlib import Path
 import sys
 
@@ -7,74 +8,227 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 from utils.logger import logger
 from utils.paths import AUDIO_FILES_DIR, TEMP_DIR, LOG_FILE,AUDIO_DATA_DIR
 from utils.helpers import format_time
-import whisper
+from utils.model_registry import get_whisper, whisper_lock
+from .decoder import decode_audio, iter_audio_blocks
+from .transcript_cache import hash_audio_file, transcript_key, load_cached_transcript, store_cached_transcript
+
+def format_words(words: list[dict], offset: float = 0.0) -> list[dict]:
+    """Word timings in seconds, kept so later stages can locate sensitive words in the audio."""
+    return [{"word": w["word"], "start": round(offset + w["start"], 3), "end": round(offset + w["end"], 3)}
+            for w in words]
+
 
 class AudioTranscriber:
     def __init__(self, model_size: str = "base"):
-        try:
-            self.model = whisper.load_model(model_size)
-            logger.info(f"Whisper model '{model_size}' loaded.")
-        except Exception as e:
-            logger.error(f"Unable to load Whisper model: {e}")
-            self.model = None
+        # Whisper is loaded on first use through the shared model registry
+        self.model_size = model_size
+        self._model = None
+        self._load_failed = False
 
         self.segments_with_confidence: list[dict] = []
         self.transcription_file: str | None = None
 
+    @property
+    def model(self):
+        if self._model is None and not self._load_failed:
+            try:
+                self._model = get_whisper(self.model_size)
+                logger.info(f"Whisper model '{self.model_size}' loaded.")
+            except Exception as e:
+                logger.error(f"Unable to load Whisper model: {e}")
+                self._load_failed = True
+        return self._model
+
     def transcribe_audio(self, filepath: str,
-                         save_directory=AUDIO_DATA_DIR) -> Path | None:
+                         save_directory=AUDIO_DATA_DIR, long_audio: bool = False,
+                         workers: int | None = None, vad: bool = False,
+                         use_cache: bool = True, transcript_name: str | None = None) -> Path | None:
 
-        if not self.model:
-            logger.error("ASR model not loaded.")
-            return None
         if not os.path.exists(filepath):
             logger.error(f"Audio file not found: {filepath}")
             return None
 
         try:
-            logger.info(f"Transcribing: {filepath}")
-            result = self.model.transcribe(str(filepath), beam_size=5, word_timestamps=True, verbose=False)
-            segments = result.get("segments", [])
-            lang = result.get("language", "unknown")
-
-            if not segments:
-                logger.warning("No speech detected in audio.")
-                return None
-
-            self.segments_with_confidence.clear()
-            for seg in segments:
-                self.segments_with_confidence.append({
-                    "start": format_time(seg["start"]),
-                    "end": format_time(seg["end"]),
-                    "text": seg["text"].strip(),
-                    "confidence": round(self._segment_conf(seg), 4),
-                })
-
-            base = os.path.splitext(os.path.basename(filepath))[0]
-            os.makedirs(save_directory, exist_ok=True)
-            json_path = save_directory / f"{base}.json"
-            self.transcription_file = str(json_path)
-
-            with open(json_path, "w", encoding="utf-8") as f:
-                json.dump({
-                    "file": str(filepath),
-                    "language": lang,
-                    "language_warning": {
-                        "triggered": lang != "en",
-                        "severity": "Warning" if lang != "en" else "None",
-                        "message": f"Non-English language detected ({lang})" if lang != "en" else ""
-                    },
-                    "segments": self.segments_with_confidence,
-                    "raw_text": " ".join(seg["text"].strip() for seg in segments)
-                }, f, indent=4, ensure_ascii=False)
-
-            logger.info(f"Transcription saved: {json_path}")
-            return json_path
+            cache_key = None
+            transcript = None
+            if use_cache:
+                options = {"beam_size": 5, "word_timestamps": True, "long_audio": long_audio, "vad": vad}
+                cache_key = transcript_key(hash_audio_file(filepath), self.model_size, options)
+                transcript = load_cached_transcript(cache_key)
+
+            if transcript is None:
+                if not long_audio and not self.model:
+                    logger.error("ASR model not loaded.")
+                    return None
+                logger.info(f"Transcribing: {filepath}")
+                result = self._run_asr(str(filepath), long_audio, workers, vad)
+                segments = result.get("segments", [])
+                lang = result.get("language", "unknown")
+
+                if not segments:
+                    logger.warning("No speech detected in audio.")
+                    return None
+
+                transcript = self._build_transcript(filepath, segments, lang, result.get("vad"))
+                if cache_key:
+                    store_cached_transcript(cache_key, transcript)
+
+            return self._save_transcript(filepath, transcript, save_directory, transcript_name)
 
         except Exception as e:
             logger.error(f"Transcription error: {e}")
             return None
 
+    def _build_transcript(self, filepath, segments: list[dict], lang: str, vad_stats: dict | None = None) -> dict:
+        return {
+            "file": str(filepath),
+            "language": lang,
+            "language_warning": {
+                "triggered": lang != "en",
+                "severity": "Warning" if lang != "en" else "None",
+                "message": f"Non-English language detected ({lang})" if lang != "en" else ""
+            },
+            "segments": [self._format_segment(seg) for seg in segments],
+            "raw_text": " ".join(seg["text"].strip() for seg in segments),
+            **({"vad": vad_stats} if vad_stats else {}),
+        }
+
+    def _format_segment(self, seg: dict) -> dict:
+        return {
+            "start": format_time(seg["start"]),
+            "end": format_time(seg["end"]),
+            "text": seg["text"].strip(),
+            "confidence": round(self._segment_conf(seg), 4),
+            "words": format_words(seg.get("words", [])),
+        }
+
+    def _save_transcript(self, filepath, transcript: dict, save_directory, name: str | None = None) -> Path:
+        transcript["file"] = str(filepath)
+        self.segments_with_confidence.clear()
+        self.segments_with_confidence.extend(transcript["segments"])
+
+        save_directory = Path(save_directory)
+        base = name or os.path.splitext(os.path.basename(filepath))[0]
+        os.makedirs(save_directory, exist_ok=True)
+        json_path = save_directory / f"{base}.json"
+        self.transcription_file = str(json_path)
+
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(transcript, f, indent=4, ensure_ascii=False)
+
+        logger.info(f"Transcription saved: {json_path}")
+        return json_path
+
+    def iter_segments(self, filepath: str, save_directory=AUDIO_DATA_DIR, vad: bool = False,
+                      use_cache: bool = True, transcript_name: str | None = None):
+        """Yield formatted transcript segments chunk by chunk while Whisper is still decoding.
+
+        The complete transcript JSON is written (and cached) once the last chunk is done,
+        exactly as ``transcribe_audio`` would write it, as ``<transcript_name or stem>.json``.
+        """
+        from .chunking import iter_chunks, OVERLAP_SECONDS, SAMPLE_RATE
+
+        cache_key = None
+        if use_cache:
+            options = {"beam_size": 5, "word_timestamps": True, "long_audio": True, "vad": vad}
+            cache_key = transcript_key(hash_audio_file(filepath), self.model_size, options)
+            cached = load_cached_transcript(cache_key)
+            if cached:
+                yield from cached["segments"]
+                self._save_transcript(filepath, cached, save_directory, transcript_name)
+                return
+
+        if not self.model:
+            raise RuntimeError("ASR model not loaded.")
+
+        time_map, vad_stats = None, None
+        if vad:
+            from .vad import detect_speech, compact_audio, speech_stats, remap_segments
+            audio = decode_audio(filepath)
+            regions = detect_speech(audio)
+            vad_stats = speech_stats(audio, regions)
+            audio, time_map = compact_audio(audio, regions)
+            blocks = [audio] if regions else []
+        else:
+            blocks = iter_audio_blocks(filepath)
+
+        half_overlap = OVERLAP_SECONDS / 2
+        segments, languages, tail = [], [], []
+        asr_seconds = 0.0
+        for chunk, start, end in iter_chunks(blocks):
+            offset = start / SAMPLE_RATE
+            with whisper_lock(self.model_size):
+                mark = time.perf_counter()
+                result = self.model.transcribe(chunk, beam_size=5, word_timestamps=True, verbose=None, fp16=False)
+                asr_seconds += time.perf_counter() - mark
+            languages.append(result.get("language", "unknown"))
+            # The seam between chunks is the middle of their overlap: segments starting before it
+            # belong to the earlier chunk. The part past this chunk's seam is held back in ``tail``
+            # and only used if no later chunk arrives to cover it.
+            lower = offset + half_overlap if start > 0 else float("-inf")
+            upper = end / SAMPLE_RATE - half_overlap
+            tail = []
+            for seg in result.get("segments", []):
+                seg["start"] += offset
+                seg["end"] += offset
+                for word in seg.get("words", []):
+                    word["start"] += offset
+                    word["end"] += offset
+                if seg["start"] < lower:
+                    continue
+                if seg["start"] >= upper:
+                    tail.append(seg)
+                    continue
+                if time_map:
+                    remap_segments([seg], time_map)
+                segments.append(seg)
+                yield self._format_segment(seg)
+        for seg in tail:
+            if time_map:
+                remap_segments([seg], time_map)
+            segments.append(seg)
+            yield self._format_segment(seg)
+
+        lang = max(set(languages), key=languages.count) if languages else "unknown"
+        if vad_stats:
+            from .vad import record_asr_time
+            record_asr_time(vad_stats, asr_seconds)
+        transcript = self._build_transcript(filepath, segments, lang, vad_stats)
+        if cache_key and segments:
+            store_cached_transcript(cache_key, transcript)
+        self._save_transcript(filepath, transcript, save_directory, transcript_name)
+
+    def _run_asr(self, filepath: str, long_audio: bool, workers: int | None, vad: bool) -> dict:
+        if long_audio and not vad:
+            # Stream the decode so multi-hour inputs are never fully in memory
+            from .chunking import transcribe_long_audio
+            return transcribe_long_audio(iter_audio_blocks(filepath), self.model_size, workers)
+
+        audio = decode_audio(filepath)
+        time_map, vad_stats = None, None
+        if vad:
+            from .vad import detect_speech, compact_audio, speech_stats
+            regions = detect_speech(audio)
+            vad_stats = speech_stats(audio, regions)
+            if not regions:
+                return {"segments": [], "language": "unknown", "vad": vad_stats}
+            audio, time_map = compact_audio(audio, regions)
+
+        start = time.perf_counter()
+        if long_audio:
+            from .chunking import transcribe_long_audio
+            result = transcribe_long_audio(audio, self.model_size, workers)
+        else:
+            with whisper_lock(self.model_size):
+                result = self.model.transcribe(audio, beam_size=5, word_timestamps=True, verbose=False)
+        elapsed = time.perf_counter() - start
+
+        if vad:
+            from .vad import remap_segments, record_asr_time
+            remap_segments(result.get("segments", []), time_map)
+            result["vad"] = record_asr_time(vad_stats, elapsed)
+        return result
+
     @staticmethod
     def _segment_conf(segment) -> float:
         if "words" in segment:
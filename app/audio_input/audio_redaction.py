@@ -0,0 +1,163 @@
+import os
+import subprocess
+import numpy as np
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+from utils.paths import OUTPUT_DIR
+from utils.helpers import parse_time
+from utils.json_io import load_json
+from utils.manifest import hash_data, hash_file, load_manifest, save_manifest, stage_is_current, record_stage
+
+MODES = ("mute", "bleep")
+FORMATS = ("wav", "mp3")
+BLEEP_HZ = 1000.0
+BLEEP_LEVEL = 0.25        # tone amplitude as a fraction of full scale
+PAD_SECONDS = 0.05        # extra audio covered before and after every span
+FADE_SECONDS = 0.01       # crossfade at span edges so the cut does not click
+BLOCK_SECONDS = 30.0      # long spans are rewritten this many seconds at a time
+
+
+def probe_audio(path) -> tuple[int, int]:
+    """Sample rate and channel count of the first audio stream."""
+    try:
+        out = subprocess.run(["ffprobe", "-v", "error", "-select_streams", "a:0",
+                              "-show_entries", "stream=sample_rate,channels", "-of", "csv=p=0", str(path)],
+                             capture_output=True, check=True, text=True).stdout
+    except FileNotFoundError:
+        raise RuntimeError("ffprobe was not found on PATH.")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to probe audio: {e.stderr[-300:]}") from e
+    rate, channels = out.strip().splitlines()[0].split(",")
+    return int(rate), int(channels)
+
+
+def decode_to_pcm_file(path, pcm_path: Path, rate: int, channels: int):
+    """Let ffmpeg write raw 16-bit PCM straight to disk at the source rate and layout."""
+    subprocess.run(["ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-i", str(path), "-vn",
+                    "-f", "s16le", "-acodec", "pcm_s16le", "-ar", str(rate), "-ac", str(channels), str(pcm_path)],
+                   check=True)
+
+
+def encode_pcm_file(pcm_path: Path, out_path: Path, rate: int, channels: int):
+    subprocess.run(["ffmpeg", "-nostdin", "-y", "-loglevel", "error", "-f", "s16le", "-ar", str(rate),
+                    "-ac", str(channels), "-i", str(pcm_path), str(out_path)], check=True)
+
+
+def _span_times(seg: dict) -> list[tuple[float, float]]:
+    """Time ranges to silence for one segment: only the words under its rule spans when it has them."""
+    words = seg.get("words") or []
+    seg_start, seg_end = parse_time(seg["start"]), parse_time(seg["end"])
+    if not words:
+        return [(seg_start, seg_end)]
+    spans = seg.get("pii_spans")
+    if spans is None:
+        return [(words[0]["start"], words[-1]["end"])]
+
+    # Whisper words concatenate to the segment text (before stripping), so offsets line up
+    joined = "".join(w["word"] for w in words)
+    lead = len(joined) - len(joined.lstrip())
+    if joined.strip() != seg["text"]:
+        return [(words[0]["start"], words[-1]["end"])]
+    bounds = np.cumsum([0] + [len(w["word"]) for w in words]) - lead
+    ranges = []
+    for span in spans:
+        hit = np.flatnonzero((bounds[:-1] < span["end"]) & (bounds[1:] > span["start"]))
+        if hit.size:
+            ranges.append((words[hit[0]]["start"], words[hit[-1]]["end"]))
+    return ranges
+
+
+def collect_spans(segments: list[dict], include_warning: bool = False) -> list[tuple[float, float]]:
+    """Merged, padded (start, end) seconds to redact for Critical (and optionally Warning) segments."""
+    labels = {"Critical", "Warning"} if include_warning else {"Critical"}
+    ranges = sorted(r for seg in segments if seg.get("sensitivity") in labels for r in _span_times(seg))
+    merged: list[tuple[float, float]] = []
+    for start, end in ranges:
+        start, end = max(0.0, start - PAD_SECONDS), end + PAD_SECONDS
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def apply_spans(pcm: np.ndarray, spans: list[tuple[float, float]], rate: int, mode: str = "bleep"):
+    """Mute or tone-replace ``spans`` in place in a (frames, channels) int16 buffer, e.g. a memmap.
+
+    Each block is one crossfade computed over the whole slice, so only ``BLOCK_SECONDS`` of
+    audio is ever resident regardless of file length.
+    """
+    fade = max(1, int(FADE_SECONDS * rate))
+    block = int(BLOCK_SECONDS * rate)
+    for start, end in spans:
+        a, b = min(int(start * rate), len(pcm)), min(int(end * rate), len(pcm))
+        for s in range(a, b, block):
+            e = min(s + block, b)
+            idx = np.arange(s, e)
+            env = np.clip(np.minimum(idx - a, b - 1 - idx) / fade, 0.0, 1.0).astype(np.float32)[:, None]
+            x = pcm[s:e].astype(np.float32)
+            if mode == "bleep":
+                tone = (BLEEP_LEVEL * 32767 * np.sin(2 * np.pi * BLEEP_HZ * idx / rate)).astype(np.float32)[:, None]
+                y = x * (1 - env) + tone * env
+            else:
+                y = x * (1 - env)
+            pcm[s:e] = np.clip(np.round(y), -32768, 32767).astype(np.int16)
+
+
+def redact_audio(audio_path, segments: list[dict], out_path: Path, mode: str = "bleep",
+                 include_warning: bool = False) -> Path | None:
+    """Write a copy of the recording with sensitive spans muted or bleeped.
+
+    The audio is decoded to a raw PCM file, edited in place through a memory map and
+    encoded back out by ffmpeg, so multi-hour recordings never sit in RAM.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown audio redaction mode '{mode}', expected one of {MODES}")
+    out_path = Path(out_path)
+    spans = collect_spans(segments, include_warning)
+    pcm_path = out_path.with_suffix(".pcm")
+    try:
+        rate, channels = probe_audio(audio_path)
+        decode_to_pcm_file(audio_path, pcm_path, rate, channels)
+        if spans and os.path.getsize(pcm_path):
+            pcm = np.memmap(pcm_path, dtype=np.int16, mode="r+").reshape(-1, channels)
+            apply_spans(pcm, spans, rate, mode)
+            pcm.flush()
+            del pcm
+        encode_pcm_file(pcm_path, out_path, rate, channels)
+    except (subprocess.CalledProcessError, RuntimeError, FileNotFoundError) as e:
+        # ffmpeg/ffprobe missing or failing: the text outputs are already written, so just log
+        logger.error(f"Audio redaction failed for {audio_path}: {e}")
+        return None
+    finally:
+        pcm_path.unlink(missing_ok=True)
+
+    covered = sum(end - start for start, end in spans)
+    logger.info(f"Redacted audio saved to: {out_path} ({len(spans)} spans, {covered:.1f}s {mode}d)")
+    return out_path
+
+
+def write_redacted_audio(audio_path, key: str, mode: str = "bleep", include_warning: bool = False,
+                         fmt: str = "wav") -> Path | None:
+    """Audio redaction stage for a finished run: reads its classified JSON and skips if unchanged."""
+    classified = load_json(OUTPUT_DIR / f"classified_transcript_{key}.json", default={})
+    segments = classified.get("segments", [])
+    if not segments:
+        logger.error(f"No classified transcript for {key}; cannot redact audio.")
+        return None
+
+    out_path = OUTPUT_DIR / f"redacted_audio_{key}.{fmt}"
+    manifest = load_manifest(key)
+    inputs = {"audio": hash_file(audio_path), "spans": hash_data(collect_spans(segments, include_warning)),
+              "mode": mode, "format": fmt}
+    if stage_is_current(manifest, "audio", inputs):
+        logger.info(f"Redacted audio unchanged, reusing {out_path.name}")
+        return out_path
+    if redact_audio(audio_path, segments, out_path, mode, include_warning) is None:
+        return None
+    record_stage(manifest, "audio", inputs, {"redacted_audio": out_path})
+    save_manifest(key, manifest)
+    return out_path
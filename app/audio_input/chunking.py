@@ -0,0 +1,133 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+from .vad import frame_energy
+
+SAMPLE_RATE = 16000          # Whisper's native input rate
+CHUNK_SECONDS = 120.0        # target chunk length before snapping to silence
+OVERLAP_SECONDS = 2.0        # audio shared by neighbouring chunks
+SEARCH_SECONDS = 10.0        # how far around the target to look for a quiet split point
+FRAME_SECONDS = 0.03
+
+DECODE_OPTIONS = {"beam_size": 5, "word_timestamps": True, "verbose": None, "fp16": False}
+
+_worker_model = None
+
+
+def iter_chunks(blocks, sr: int = SAMPLE_RATE, chunk_seconds: float = CHUNK_SECONDS,
+                overlap_seconds: float = OVERLAP_SECONDS, search_seconds: float = SEARCH_SECONDS):
+    """Yield (audio, start_sample, end_sample) chunks from an iterable of audio blocks.
+
+    Each chunk is cut at the quietest frame within ``search_seconds`` of its target
+    length and extended by half the overlap on each side. Only about one chunk of
+    audio is buffered at a time, so ``blocks`` can stream from a multi-hour file.
+    """
+    frame = max(1, int(sr * FRAME_SECONDS))
+    chunk = int(chunk_seconds * sr)
+    search = int(search_seconds * sr)
+    half_overlap = int(overlap_seconds * sr) // 2
+
+    buffer = np.zeros(0, dtype=np.float32)
+    buffer_start = 0   # absolute sample index of buffer[0]
+    cut = 0            # absolute sample index where the next chunk begins
+    for block in blocks:
+        buffer = np.concatenate((buffer, block))
+        while buffer_start + len(buffer) - cut >= chunk + search:
+            lo = cut + chunk - search - buffer_start
+            energy = frame_energy(buffer[lo:lo + 2 * search], sr)
+            next_cut = buffer_start + lo + int(np.argmin(energy)) * frame
+            start = max(0, cut - half_overlap)
+            end = next_cut + half_overlap
+            yield buffer[start - buffer_start:end - buffer_start], start, end
+            cut = next_cut
+            keep_from = max(0, cut - half_overlap) - buffer_start
+            buffer, buffer_start = buffer[keep_from:], buffer_start + keep_from
+
+    end = buffer_start + len(buffer)
+    if end > cut:
+        start = max(0, cut - half_overlap)
+        yield buffer[start - buffer_start:], start, end
+
+
+def _init_worker(model_size: str, threads: int):
+    global _worker_model
+    import torch
+    import whisper
+
+    torch.set_num_threads(max(1, threads))
+    _worker_model = whisper.load_model(model_size)
+
+
+def _transcribe_chunk(args) -> dict:
+    audio, offset = args
+    result = _worker_model.transcribe(audio, **DECODE_OPTIONS)
+    for seg in result.get("segments", []):
+        seg["start"] += offset
+        seg["end"] += offset
+        for word in seg.get("words", []):
+            word["start"] += offset
+            word["end"] += offset
+    return {"segments": result.get("segments", []), "language": result.get("language", "unknown")}
+
+
+def merge_chunk_segments(chunk_results: list[dict], bounds: list[tuple[int, int]], sr: int = SAMPLE_RATE) -> list[dict]:
+    """Stitch per-chunk segments, keeping each overlapped region from one chunk only.
+
+    The cut between neighbouring chunks is the middle of their overlap: segments (and
+    words) starting before it come from the earlier chunk, the rest from the later one.
+    """
+    merged = []
+    for i, result in enumerate(chunk_results):
+        lower = (bounds[i][0] + bounds[i - 1][1]) / 2 / sr if i > 0 else float("-inf")
+        upper = (bounds[i + 1][0] + bounds[i][1]) / 2 / sr if i + 1 < len(bounds) else float("inf")
+        for seg in result["segments"]:
+            if not lower <= seg["start"] < upper:
+                continue
+            if "words" in seg:
+                seg["words"] = [w for w in seg["words"] if w["start"] < upper]
+            merged.append(seg)
+
+    # Drop words repeated across the seam (same text at nearly the same time)
+    for prev, cur in zip(merged, merged[1:]):
+        if prev.get("words") and cur.get("words"):
+            last = prev["words"][-1]
+            while cur["words"] and cur["words"][0]["word"].strip().lower() == last["word"].strip().lower() \
+                    and cur["words"][0]["start"] - last["start"] < 0.5:
+                cur["words"].pop(0)
+            if cur["words"]:
+                cur["text"] = "".join(w["word"] for w in cur["words"])
+                cur["start"] = cur["words"][0]["start"]
+    return [seg for seg in merged if seg.get("words") != []]
+
+
+def transcribe_long_audio(audio, model_size: str = "base", workers: int | None = None,
+                          sr: int = SAMPLE_RATE) -> dict:
+    """Transcribe 16 kHz mono audio in silence-aligned chunks across a process pool.
+
+    ``audio`` is either a decoded array or an iterable of blocks (see
+    ``decoder.iter_audio_blocks``); at most ``2 * workers`` chunks are in flight.
+    """
+    blocks = [audio] if isinstance(audio, np.ndarray) else audio
+    workers = max(1, workers or os.cpu_count() or 1)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    bounds, futures = [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_size, threads)) as pool:
+        for chunk, start, end in iter_chunks(blocks, sr):
+            # Bound memory: wait for the oldest chunk before queueing more
+            while sum(not f.done() for f in futures) >= 2 * workers:
+                next(f for f in futures if not f.done()).result()
+            futures.append(pool.submit(_transcribe_chunk, (chunk, start / sr)))
+            bounds.append((start, end))
+        chunk_results = [f.result() for f in futures]
+
+    total_seconds = bounds[-1][1] / sr if bounds else 0.0
+    logger.info(f"Long-audio mode: {total_seconds:.0f}s split into {len(bounds)} chunks across {workers} workers.")
+    languages = [r["language"] for r in chunk_results if r["segments"]]
+    language = max(set(languages), key=languages.count) if languages else "unknown"
+    return {"segments": merge_chunk_segments(chunk_results, bounds, sr), "language": language}
@@ -0,0 +1,67 @@
+import subprocess
+import wave
+import numpy as np
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+
+SAMPLE_RATE = 16000
+BLOCK_SECONDS = 30.0
+
+
+def _ffmpeg_command(path, sr: int) -> list[str]:
+    # Decode any container/codec ffmpeg understands straight to 16-bit mono PCM on stdout
+    return ["ffmpeg", "-nostdin", "-threads", "0", "-i", str(path),
+            "-vn", "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr), "-"]
+
+
+def read_native_wav(path, sr: int = SAMPLE_RATE) -> np.ndarray | None:
+    """Read a 16-bit mono WAV already at ``sr`` Hz directly, or return None if it needs ffmpeg."""
+    if str(path).lower().endswith(".wav"):
+        try:
+            with wave.open(str(path), "rb") as wf:
+                if wf.getframerate() == sr and wf.getnchannels() == 1 and wf.getsampwidth() == 2:
+                    return np.frombuffer(wf.readframes(wf.getnframes()), np.int16).astype(np.float32) / 32768.0
+        except (wave.Error, EOFError):
+            pass
+    return None
+
+
+def decode_audio(path, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode a media file to a mono float32 array at ``sr`` Hz in a single ffmpeg pass.
+
+    Recordings captured at the target rate skip ffmpeg entirely.
+    """
+    native = read_native_wav(path, sr)
+    if native is not None:
+        return native
+    try:
+        out = subprocess.run(_ffmpeg_command(path, sr), capture_output=True, check=True).stdout
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg was not found on PATH.")
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='replace')[-300:]}") from e
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def iter_audio_blocks(path, sr: int = SAMPLE_RATE, block_seconds: float = BLOCK_SECONDS):
+    """Yield successive float32 blocks of decoded audio without holding the whole file in memory."""
+    block_bytes = int(block_seconds * sr) * 2
+    proc = subprocess.Popen(_ffmpeg_command(path, sr), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    finished = False
+    try:
+        while True:
+            raw = proc.stdout.read(block_bytes)
+            if not raw:
+                finished = True
+                break
+            usable = len(raw) - len(raw) % 2
+            yield np.frombuffer(raw[:usable], np.int16).astype(np.float32) / 32768.0
+    finally:
+        if not finished:
+            proc.kill()
+        proc.stdout.close()
+        if proc.wait() != 0 and finished:
+            logger.warning(f"ffmpeg exited with status {proc.returncode} while streaming {path}")
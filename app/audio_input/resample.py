@@ -0,0 +1,60 @@
+import numpy as np
+
+HALF_TAPS = 16          # sinc lobes on each side of every output sample
+KAISER_BETA = 8.6       # ~80 dB stop-band attenuation
+
+
+class StreamingResampler:
+    """Band-limited (Kaiser-windowed sinc) resampler for int16 PCM fed block by block.
+
+    Input history is carried between blocks so there are no seams at block edges.
+    Each block is processed with a single gather + weighted sum over all outputs.
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, half_taps: int = HALF_TAPS):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.step = src_rate / dst_rate                  # input samples per output sample
+        self.cutoff = min(1.0, dst_rate / src_rate)      # anti-alias when downsampling
+        self.half_taps = int(np.ceil(half_taps / self.cutoff))
+        self._history = np.zeros(self.half_taps, dtype=np.float32)
+        self._history_start = -self.half_taps            # absolute input index of _history[0]
+        self._next_out = 0                                # absolute index of the next output sample
+
+    def process(self, pcm: bytes) -> bytes:
+        block = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+        x = np.concatenate((self._history, block))
+        available_end = self._history_start + len(x)
+
+        # Outputs whose full filter support is already buffered
+        last_out = int(np.floor((available_end - self.half_taps - 1) / self.step))
+        if last_out < self._next_out:
+            self._history = x
+            return b""
+        out_idx = np.arange(self._next_out, last_out + 1)
+        centers = out_idx * self.step
+        base = np.floor(centers).astype(np.int64) - self.half_taps + 1
+        offsets = np.arange(2 * self.half_taps)
+        taps = base[:, None] + offsets[None, :]                      # (n_out, 2 * half_taps)
+        dist = centers[:, None] - taps
+        window = np.kaiser(2 * self.half_taps + 1, KAISER_BETA)
+        w = self.cutoff * np.sinc(self.cutoff * dist) * np.interp(
+            dist, np.linspace(-self.half_taps, self.half_taps, len(window)), window)
+        y = np.einsum("ij,ij->i", x[taps - self._history_start], w)
+
+        self._next_out = last_out + 1
+        keep_from = int(np.floor(self._next_out * self.step)) - self.half_taps + 1
+        self._history = x[keep_from - self._history_start:]
+        self._history_start = keep_from
+        return np.clip(np.round(y), -32768, 32767).astype(np.int16).tobytes()
+
+
+def resample_pcm(pcm: bytes, src_rate: int, dst_rate: int) -> bytes:
+    """One-shot helper around :class:`StreamingResampler`; pads the tail so no audio is lost."""
+    if src_rate == dst_rate:
+        return pcm
+    resampler = StreamingResampler(src_rate, dst_rate)
+    tail = np.zeros(2 * resampler.half_taps, dtype=np.int16).tobytes()
+    out = resampler.process(pcm) + resampler.process(tail)
+    expected = int(len(pcm) // 2 * dst_rate / src_rate)
+    return out[:expected * 2]
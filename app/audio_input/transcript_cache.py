@@ -0,0 +1,42 @@
+import hashlib
+import json
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+from utils.paths import TRANSCRIPT_CACHE_DIR
+from utils.json_io import load_json, save_json
+
+HASH_CHUNK_BYTES = 1 << 20
+# Bump whenever the transcript JSON layout changes, so older cache entries are not reused
+# (2: segments carry per-word timings in "words")
+TRANSCRIPT_SCHEMA = 2
+
+
+def hash_audio_file(path) -> str:
+    """SHA-256 of the file contents, read in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def transcript_key(audio_hash: str, model_size: str, options: dict) -> str:
+    payload = json.dumps([audio_hash, model_size, dict(options, schema=TRANSCRIPT_SCHEMA)], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_cached_transcript(key: str) -> dict | None:
+    path = TRANSCRIPT_CACHE_DIR / f"{key}.json"
+    if not path.exists():
+        return None
+    data = load_json(path, default=None)
+    if data:
+        logger.info(f"Transcript cache hit: {key[:12]}")
+    return data
+
+
+def store_cached_transcript(key: str, data: dict):
+    save_json(TRANSCRIPT_CACHE_DIR / f"{key}.json", data)
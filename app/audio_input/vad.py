@@ -0,0 +1,124 @@
+import numpy as np
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.03
+MIN_SPEECH_SECONDS = 0.25     # shorter bursts (clicks, coughs) are ignored
+MIN_SILENCE_SECONDS = 0.8     # gaps shorter than this stay inside one speech region
+PAD_SECONDS = 0.2             # context kept around every region
+GAP_SECONDS = 0.3             # silence inserted between regions when they are stitched together
+NOISE_PERCENTILE = 10         # energy percentile taken as the noise floor
+THRESHOLD_RATIO = 3.0         # speech must be this many times louder than the noise floor
+MIN_THRESHOLD = 1e-3          # absolute floor for near-digital-silence recordings
+
+
+def frame_energy(audio: np.ndarray, sr: int = SAMPLE_RATE, frame_seconds: float = FRAME_SECONDS) -> np.ndarray:
+    """RMS energy per non-overlapping frame, computed with one reshape."""
+    frame = max(1, int(sr * frame_seconds))
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:n_frames * frame].reshape(n_frames, frame)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+
+def _runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Start and end indices (end exclusive) of every run of True in ``mask``."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def detect_speech(audio: np.ndarray, sr: int = SAMPLE_RATE) -> list[tuple[int, int]]:
+    """Return (start, end) sample ranges that contain speech, using an adaptive energy threshold."""
+    energy = frame_energy(audio, sr)
+    if energy.size == 0:
+        return []
+    frame = max(1, int(sr * FRAME_SECONDS))
+    threshold = max(MIN_THRESHOLD, float(np.percentile(energy, NOISE_PERCENTILE)) * THRESHOLD_RATIO)
+    voiced = energy > threshold
+
+    # Close short silences, then drop short bursts
+    starts, ends = _runs(~voiced)
+    short_gaps = (ends - starts) < MIN_SILENCE_SECONDS / FRAME_SECONDS
+    for s, e in zip(starts[short_gaps], ends[short_gaps]):
+        if s > 0 and e < len(voiced):
+            voiced[s:e] = True
+    starts, ends = _runs(voiced)
+    keep = (ends - starts) >= MIN_SPEECH_SECONDS / FRAME_SECONDS
+
+    pad = int(PAD_SECONDS * sr)
+    regions = []
+    for s, e in zip(starts[keep] * frame, ends[keep] * frame):
+        s, e = max(0, s - pad), min(len(audio), e + pad)
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], int(e))
+        else:
+            regions.append((int(s), int(e)))
+    return regions
+
+
+def compact_audio(audio: np.ndarray, regions: list[tuple[int, int]],
+                  sr: int = SAMPLE_RATE) -> tuple[np.ndarray, list[tuple[float, float, float]]]:
+    """Concatenate speech regions with short gaps; return the audio and a time map.
+
+    Each map entry is (compact_start, original_start, duration) in seconds.
+    """
+    gap = np.zeros(int(GAP_SECONDS * sr), dtype=audio.dtype)
+    pieces, time_map, cursor = [], [], 0
+    for start, end in regions:
+        if pieces:
+            pieces.append(gap)
+            cursor += len(gap)
+        pieces.append(audio[start:end])
+        time_map.append((cursor / sr, start / sr, (end - start) / sr))
+        cursor += end - start
+    compact = np.concatenate(pieces) if pieces else np.zeros(0, dtype=audio.dtype)
+    return compact, time_map
+
+
+def remap_time(t: float, time_map: list[tuple[float, float, float]]) -> float:
+    """Map a timestamp in compacted audio back to the original timeline."""
+    for compact_start, original_start, duration in reversed(time_map):
+        if t >= compact_start:
+            return original_start + min(t - compact_start, duration)
+    return time_map[0][1] if time_map else t
+
+
+def remap_segments(segments: list[dict], time_map: list[tuple[float, float, float]]) -> list[dict]:
+    for seg in segments:
+        seg["start"] = remap_time(seg["start"], time_map)
+        seg["end"] = remap_time(seg["end"], time_map)
+        for word in seg.get("words", []):
+            word["start"] = remap_time(word["start"], time_map)
+            word["end"] = remap_time(word["end"], time_map)
+    return segments
+
+
+def speech_stats(audio: np.ndarray, regions: list[tuple[int, int]], sr: int = SAMPLE_RATE) -> dict:
+    total = len(audio) / sr
+    speech = sum(end - start for start, end in regions) / sr
+    skipped = (1 - speech / total) if total else 0.0
+    logger.info(f"VAD kept {speech:.1f}s of {total:.1f}s audio in {len(regions)} regions "
+                f"({skipped * 100:.1f}% skipped).")
+    return {
+        "total_seconds": round(total, 2),
+        "speech_seconds": round(speech, 2),
+        "regions": len(regions),
+        "skipped_fraction": round(skipped, 4),
+    }
+
+
+def record_asr_time(stats: dict, asr_seconds: float) -> dict:
+    """Add the Whisper time spent on the kept speech and an estimate of what the skipped audio would have cost."""
+    # Decode time scales roughly with audio length
+    speech = stats["speech_seconds"] or 1.0
+    skipped = stats["total_seconds"] - stats["speech_seconds"]
+    stats["asr_seconds"] = round(asr_seconds, 2)
+    stats["estimated_seconds_saved"] = round(asr_seconds * skipped / speech, 2)
+    logger.info(f"VAD: Whisper ran {stats['asr_seconds']:.1f}s; skipping silence saved about "
+                f"{stats['estimated_seconds_saved']:.1f}s.")
+    return stats
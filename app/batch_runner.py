@@ -0,0 +1,115 @@
+import glob
+import hashlib
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+from utils.paths import AUDIO_FILES_DIR, OUTPUT_DIR
+from utils.helpers import parse_time
+from utils.json_io import load_json
+from utils.manifest import load_manifest
+from app.text_input.llm_handler import enrich_and_redact_segments, normalize_topics
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".mp4", ".m4a", ".flac", ".ogg", ".webm"}
+
+
+def collect_inputs(pattern: str) -> list[Path]:
+    """Audio files in a directory, or matching a glob pattern, sorted by name."""
+    path = Path(pattern)
+    candidates = path.iterdir() if path.is_dir() else (Path(p) for p in glob.glob(pattern, recursive=True))
+    return sorted(p for p in candidates if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS)
+
+
+def output_key(path: Path) -> str:
+    """Stable key used in output and transcript file names: the sanitized stem plus a short hash
+    of the absolute path, so same-named files in different directories, or recordings sharing
+    a timestamp, never share outputs."""
+    stem = re.sub(r"[^\w.-]", "_", Path(path).stem)
+    digest = hashlib.sha256(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:8]
+    return f"{stem}_{digest}"
+
+
+def is_done(path: Path, topics: list[str]) -> bool:
+    """Outputs exist and were classified against the same topics (else re-run incrementally)."""
+    key = output_key(path)
+    if not all((OUTPUT_DIR / f"{name}_{key}{ext}").exists()
+               for name, ext in (("redacted_transcript", ".json"), ("privacy_report", ".txt"))):
+        return False
+    classified_for = load_manifest(key)["stages"].get("classify", {}).get("inputs", {}).get("topics")
+    return classified_for is None or classified_for == normalize_topics(topics)
+
+
+def _init_worker(threads: int):
+    import torch
+    torch.set_num_threads(max(1, threads))
+
+
+def _transcribe(path: str, model_size: str, options: dict) -> tuple[str, str | None, float]:
+    # Runs in a worker process; the registry keeps one Whisper model per process
+    from app.audio_input.Transcriber import AudioTranscriber
+
+    start = time.perf_counter()
+    transcript = AudioTranscriber(model_size).transcribe_audio(path, save_directory=AUDIO_FILES_DIR,
+                                                               transcript_name=output_key(Path(path)), **options)
+    return path, str(transcript) if transcript else None, time.perf_counter() - start
+
+
+def run_batch(pattern: str, topics: list[str], model_size: str = "base", workers: int | None = None,
+              classify_workers: int = 2, transcribe_options: dict | None = None, classify_options: dict | None = None):
+    """Transcribe many files on a process pool while a thread pool classifies finished transcripts."""
+    inputs = collect_inputs(pattern)
+    pending = [p for p in inputs if not is_done(p, topics)]
+    skipped = len(inputs) - len(pending)
+    logger.info(f"Batch: {len(inputs)} files found, {skipped} already processed, {len(pending)} to run.")
+    if not pending:
+        return []
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending)))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    transcribe_options = transcribe_options or {}
+    classify_options = classify_options or {}
+    stats = {}
+    batch_start = time.perf_counter()
+
+    def _classify(path: Path, transcript_path: str):
+        start = time.perf_counter()
+        enrich_and_redact_segments(Path(transcript_path), topics, output_key=output_key(path), **classify_options)
+        stats[path]["classify_seconds"] = time.perf_counter() - start
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(threads,)) as asr_pool, \
+            ThreadPoolExecutor(max_workers=max(1, classify_workers)) as llm_pool:
+        asr_futures = [asr_pool.submit(_transcribe, str(p), model_size, transcribe_options) for p in pending]
+        llm_futures = []
+        for future in as_completed(asr_futures):
+            try:
+                path, transcript_path, seconds = future.result()
+            except Exception as e:
+                logger.error(f"Batch transcription failed: {e}")
+                continue
+            path = Path(path)
+            segments = load_json(Path(transcript_path), default={}).get("segments", []) if transcript_path else []
+            audio_seconds = parse_time(segments[-1]["end"]) if segments else 0.0
+            stats[path] = {"transcribe_seconds": seconds, "audio_seconds": audio_seconds, "classify_seconds": 0.0}
+            if transcript_path:
+                llm_futures.append(llm_pool.submit(_classify, path, transcript_path))
+            else:
+                logger.error(f"No transcript for {path.name}")
+        for future in llm_futures:
+            future.result()
+
+    wall = time.perf_counter() - batch_start
+    summary = []
+    for path, s in stats.items():
+        speed = s["audio_seconds"] / s["transcribe_seconds"] if s["transcribe_seconds"] else 0.0
+        logger.info(f"  {path.name}: {s['audio_seconds']:.0f}s audio, transcribe {s['transcribe_seconds']:.1f}s "
+                    f"({speed:.1f}x realtime), classify {s['classify_seconds']:.1f}s")
+        summary.append({"file": str(path), **s})
+    total_audio = sum(s["audio_seconds"] for s in stats.values())
+    logger.info(f"Batch finished: {len(stats)} files, {total_audio / 60:.1f} min of audio in {wall:.1f}s "
+                f"({total_audio / wall if wall else 0:.1f}x realtime, {len(stats) / wall * 3600 if wall else 0:.0f} files/hour).")
+    return summary
@@ -0,0 +1,70 @@
+import json
+import time
+from pathlib import Path
+import sys
+
+import requests
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+from utils.paths import JOB_SERVER_URL
+
+POLL_SECONDS = 1.0
+TERMINAL_STATES = ("done", "failed", "cancelled")
+
+
+class JobClient:
+    """Thin client for the local job server (``python -m app.job_server``)."""
+
+    def __init__(self, base_url: str = JOB_SERVER_URL, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def is_available(self) -> bool:
+        try:
+            return self.session.get(f"{self.base_url}/health", timeout=1.0).ok
+        except requests.RequestException:
+            return False
+
+    def submit(self, audio_path, topics: list[str], options: dict | None = None, upload: bool = False) -> dict:
+        """Queue a job. By default the server reads the file from disk; ``upload`` streams it over HTTP."""
+        audio_path = Path(audio_path)
+        options = options or {}
+        if upload:
+            with open(audio_path, "rb") as f:
+                response = self.session.post(f"{self.base_url}/jobs", data=f, timeout=None, params={
+                    "filename": audio_path.name, "topics": ",".join(topics), "options": json.dumps(options)})
+        else:
+            response = self.session.post(f"{self.base_url}/jobs", timeout=self.timeout, json={
+                "path": str(audio_path.resolve()), "topics": topics, "options": options})
+        response.raise_for_status()
+        job = response.json()
+        logger.info(f"Submitted {audio_path.name} to job server as {job['id']}")
+        return job
+
+    def status(self, job_id: str) -> dict:
+        response = self.session.get(f"{self.base_url}/jobs/{job_id}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def cancel(self, job_id: str) -> bool:
+        return self.session.delete(f"{self.base_url}/jobs/{job_id}", timeout=self.timeout).ok
+
+    def wait(self, job_id: str, on_status=None, poll: float = POLL_SECONDS) -> dict:
+        """Poll until the job finishes; ``on_status(job)`` sees every update."""
+        while True:
+            job = self.status(job_id)
+            if on_status:
+                on_status(job)
+            if job["status"] in TERMINAL_STATES:
+                return job
+            time.sleep(poll)
+
+    def download(self, job_id: str, name: str, dest: Path) -> Path:
+        with self.session.get(f"{self.base_url}/jobs/{job_id}/files/{name}", stream=True, timeout=self.timeout) as r:
+            r.raise_for_status()
+            with open(dest, "wb") as f:
+                for chunk in r.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+        return Path(dest)
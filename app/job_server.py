@@ -0,0 +1,311 @@
+import argparse
+import json
+import queue
+import re
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs, unquote
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+from utils.paths import JOBS_DIR, JOB_SERVER_URL
+from utils.model_registry import warm_up, is_loaded, EMBEDDER_NAME
+from app.audio_input.Transcriber import AudioTranscriber
+from app.pipeline import run_pipeline
+
+DEFAULT_WORKERS = 1
+MAX_UPLOAD_BYTES = 4 << 30      # 4 GiB
+COPY_BLOCK_BYTES = 1 << 20
+# Options a client may set per job, mapped to run_pipeline keyword arguments
+PIPELINE_OPTIONS = ("vad", "use_cache", "max_workers", "batch_token_budget", "prefilter_threshold",
+                    "pii_rules", "rephrase_batch_size", "window_tokens")
+
+
+@dataclass
+class Job:
+    id: str
+    input_path: str
+    topics: list
+    options: dict = field(default_factory=dict)
+    status: str = "queued"          # queued -> running -> done | failed | cancelled
+    key: str | None = None          # output file key, e.g. privacy_report_<key>.txt
+    created: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    progress: dict = field(default_factory=dict)
+    outputs: dict = field(default_factory=dict)
+    reused: list = field(default_factory=list)
+    error: str | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class JobQueue:
+    """Jobs waiting for, or handled by, a fixed pool of long-lived worker threads.
+
+    Workers share the process-wide model registry, so Whisper and the embedder are
+    loaded once for every job the server runs.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, model_size: str = "base"):
+        self.model_size = model_size
+        self.jobs: dict[str, Job] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._cancel_events: dict[str, threading.Event] = {}
+        self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                         for i in range(max(1, workers))]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, input_path: Path, topics: list[str], options: dict) -> Job:
+        job = Job(id=input_path.parent.name, input_path=str(input_path), topics=topics, options=options)
+        with self._lock:
+            self.jobs[job.id] = job
+        self._queue.put(job.id)
+        logger.info(f"Job {job.id} queued: {input_path.name} ({self._queue.qsize()} waiting)")
+        return job
+
+    @property
+    def workers(self) -> int:
+        return len(self._threads)
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            return [job.to_dict() for job in self.jobs.values()]
+
+    def cancel(self, job_id: str) -> bool:
+        """Drop a queued job, or ask a running one to stop at its next segment."""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job and job.status == "queued":
+                job.status = "cancelled"
+                job.finished = time.time()
+                return True
+            if job and job.status == "running":
+                self._cancel_events[job_id].set()
+                return True
+        return False
+
+    def _work(self):
+        while True:
+            job_id = self._queue.get()
+            with self._lock:
+                job = self.jobs.get(job_id)
+                if job is None or job.status != "queued":
+                    continue
+                job.status, job.started = "running", time.time()
+                cancel = self._cancel_events[job.id] = threading.Event()
+            try:
+                self._run(job, cancel)
+                job.status = "cancelled" if cancel.is_set() else "done"
+            except Exception as e:
+                logger.error(f"Job {job.id} failed: {e}")
+                job.status, job.error = ("cancelled", None) if cancel.is_set() else ("failed", str(e))
+            job.finished = time.time()
+            with self._lock:
+                self._cancel_events.pop(job.id, None)
+
+    def _run(self, job: Job, cancel: threading.Event):
+        def on_event(kind, payload):
+            if kind == "stage":
+                name, state = payload
+                job.progress.setdefault("stages", {})[name] = state
+            elif kind == "segment":
+                stage, index = payload
+                job.progress[stage] = index + 1
+
+        options = {k: v for k, v in job.options.items() if k in PIPELINE_OPTIONS}
+        # Keyed on the job, never the upload name: two uploads called meeting.mp3 must not share
+        # output files. Whisper and LLM results are still reused through their content-hash caches.
+        key = job.key = f"job_{job.id}"
+        result = run_pipeline(job.input_path, job.topics, transcriber=AudioTranscriber(self.model_size),
+                              save_directory=Path(job.input_path).parent, output_key=key,
+                              on_event=on_event, cancel=cancel, **options)
+        if cancel.is_set():
+            return
+        if result is None:
+            raise RuntimeError("Transcription failed or no speech was detected.")
+        job.outputs = {name: str(path) for name, path in result.outputs.items() if Path(path).exists()}
+        job.outputs["transcript"] = str(result.transcript_path)
+        job.reused = result.reused
+
+        if job.options.get("redact_audio"):
+            from app.audio_input.audio_redaction import write_redacted_audio
+            audio = write_redacted_audio(job.input_path, key, mode=job.options["redact_audio"],
+                                         include_warning=bool(job.options.get("redact_audio_warnings")),
+                                         fmt=job.options.get("audio_format", "wav"))
+            if audio:
+                job.outputs["redacted_audio"] = str(audio)
+
+
+def _safe_name(name: str) -> str:
+    return re.sub(r"[^\w.-]", "_", Path(unquote(name)).name) or "upload.wav"
+
+
+class JobHandler(BaseHTTPRequestHandler):
+    """REST endpoints:
+
+    POST   /jobs?filename=..&topics=a,b&options={json}   body: raw audio bytes
+    POST   /jobs   JSON body {"path", "topics", "options"} for a file already on this machine
+    GET    /jobs, /jobs/<id>, /jobs/<id>/files/<name>, /health
+    DELETE /jobs/<id>                                    cancel a queued or running job
+    """
+
+    jobs: JobQueue = None   # set by serve()
+
+    def log_message(self, format, *args):
+        logger.info(f"Job server: {self.address_string()} {format % args}")
+
+    def _send_json(self, data, status: int = 200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str):
+        self._send_json({"error": message}, status)
+
+    def do_GET(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if parts == ["health"]:
+            self._send_json({
+                "status": "ok",
+                "workers": self.jobs.workers,
+                "models": {"whisper": is_loaded(f"whisper:{self.jobs.model_size}"),
+                           "embedder": is_loaded(f"embedder:{EMBEDDER_NAME}")},
+            })
+        elif parts == ["jobs"]:
+            self._send_json(self.jobs.list())
+        elif len(parts) == 2 and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job:
+                self._send_json(job.to_dict())
+            else:
+                self._error(404, "Unknown job")
+        elif len(parts) == 4 and parts[0] == "jobs" and parts[2] == "files":
+            self._send_file(parts[1], parts[3])
+        else:
+            self._error(404, "Not found")
+
+    def _send_file(self, job_id: str, name: str):
+        job = self.jobs.get(job_id)
+        path = Path(job.outputs[name]) if job and name in job.outputs else None
+        if path is None or not path.exists():
+            self._error(404, "Unknown output")
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.send_header("Content-Disposition", f'attachment; filename="{path.name}"')
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile, COPY_BLOCK_BYTES)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/jobs":
+            self._error(404, "Not found")
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        if length <= 0 or length > MAX_UPLOAD_BYTES:
+            self._error(413 if length else 400, "Missing or oversized body")
+            return
+
+        job_dir = JOBS_DIR / uuid.uuid4().hex[:12]
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                request = json.loads(self.rfile.read(length))
+                source = Path(request["path"])
+            except (ValueError, KeyError, TypeError) as e:
+                self._error(400, f"Bad job request: {e}")
+                return
+            if not source.is_file():
+                self._error(400, f"File not found on server: {source}")
+                return
+            job_dir.mkdir(parents=True)
+            input_path = job_dir / _safe_name(source.name)
+            try:
+                input_path.hardlink_to(source)
+            except OSError:
+                shutil.copy2(source, input_path)
+            topics, options = request.get("topics", []), request.get("options", {})
+        else:
+            query = parse_qs(url.query)
+            job_dir.mkdir(parents=True)
+            input_path = job_dir / _safe_name(query.get("filename", ["upload.wav"])[0])
+            # Stream the upload to disk instead of buffering it in memory
+            with open(input_path, "wb") as f:
+                remaining = length
+                while remaining:
+                    chunk = self.rfile.read(min(COPY_BLOCK_BYTES, remaining))
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            topics = [t.strip() for t in query.get("topics", [""])[0].split(",") if t.strip()]
+            try:
+                options = json.loads(query.get("options", ["{}"])[0])
+            except ValueError:
+                self._error(400, "options must be JSON")
+                return
+
+        if not topics:
+            self._error(400, "At least one topic is required")
+            return
+        job = self.jobs.submit(input_path, topics, options)
+        self._send_json(job.to_dict(), 202)
+
+    def do_DELETE(self):
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        if len(parts) == 2 and parts[0] == "jobs":
+            if self.jobs.cancel(parts[1]):
+                self._send_json(self.jobs.get(parts[1]).to_dict())
+            else:
+                self._error(409, "Job has already finished")
+        else:
+            self._error(404, "Not found")
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, workers: int = DEFAULT_WORKERS,
+          model_size: str = "base", embedder: bool = False):
+    """Run the job server until interrupted; models are loaded before the first request."""
+    warm_up(model_size, embedder=embedder, background=False)
+    jobs = JobQueue(workers, model_size)
+    jobs.start()
+    JobHandler.jobs = jobs
+    server = ThreadingHTTPServer((host, port), JobHandler)
+    logger.info(f"Job server listening on http://{host}:{port} with {workers} worker(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    default = urlparse(JOB_SERVER_URL)
+    parser = argparse.ArgumentParser(description="Local job server for the audio privacy pipeline")
+    parser.add_argument("--host", default=default.hostname, help="Interface to bind (keep local)")
+    parser.add_argument("--port", type=int, default=default.port)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Jobs processed at the same time")
+    parser.add_argument("--model-size", default="base", help="Whisper model kept warm for every job")
+    parser.add_argument("--embedder", action="store_true", help="Also keep the embedding pre-filter model warm")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.model_size, args.embedder)
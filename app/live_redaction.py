@@ -0,0 +1,206 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import takewhile
+from datetime import datetime
+import numpy as np
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+from utils.helpers import format_time
+from utils.paths import AUDIO_FILES_DIR
+from utils.model_registry import get_whisper, whisper_lock
+from app.audio_input.Transcriber import AudioTranscriber, format_words
+from utils.json_io import save_json
+from app.text_input.llm_handler import (classify_segment, rephrase_warning_text, write_outputs,
+                                        extract_timestamp_from_filename)
+from app.text_input.ollama_client import MAX_IN_FLIGHT
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 15.0      # audio decoded per pass once this much is pending
+HOLDBACK_SECONDS = 2.0     # segments ending this close to the window edge wait for the next pass
+CONTEXT_CHARS = 200        # committed text passed to Whisper as a prompt for continuity
+
+
+class LiveRedactor:
+    """Transcribes and redacts a recording in rolling windows while it is still being captured.
+
+    Attach it to a streaming :class:`AudioInputManager` with ``start()``. Each finalised
+    segment is classified on a thread pool and delivered, in order, through ``on_segment``
+    and through the ``iter_segments()`` generator. ``stop()`` flushes the tail and writes
+    the usual output files, so the report is ready moments after recording ends.
+    """
+
+    def __init__(self, recorder, topics: list[str], model_size: str = "base",
+                 window_seconds: float = WINDOW_SECONDS, on_segment=None, max_workers: int = MAX_IN_FLIGHT):
+        if not recorder.streaming or recorder.profile.rate != SAMPLE_RATE or recorder.profile.channels != 1:
+            raise ValueError("Live redaction needs a streaming recorder with a 16 kHz mono capture profile.")
+        self.recorder = recorder
+        self.topics = topics
+        self.model_size = model_size
+        self.window = int(window_seconds * SAMPLE_RATE)
+        self.on_segment = on_segment
+
+        self._pcm = queue.Queue()
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0          # absolute sample index of _buffer[0]
+        self._new_samples = 0           # samples added since the last decode pass
+        self._context = ""
+        self._stopping = threading.Event()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        self._pending = queue.Queue()   # futures in segment order
+        self._out = queue.Queue()
+        self.segments: list[dict] = []
+        self.latencies: list[float] = []
+        self._asr_thread = threading.Thread(target=self._asr_loop, name="live-asr", daemon=True)
+        self._emit_thread = threading.Thread(target=self._emit_loop, name="live-emit", daemon=True)
+
+    def start(self):
+        self._started = time.monotonic()
+        self.recorder.add_listener(self._pcm.put)
+        self._asr_thread.start()
+        self._emit_thread.start()
+        logger.info(f"Live redaction started for topics: {self.topics}")
+
+    def _asr_loop(self):
+        try:
+            model = get_whisper(self.model_size)
+            while True:
+                try:
+                    block = self._pcm.get(timeout=0.5)
+                    self._buffer = np.concatenate((self._buffer, np.frombuffer(block, np.int16).astype(np.float32) / 32768.0))
+                    self._new_samples += len(block) // 2
+                except queue.Empty:
+                    pass
+                final = self._stopping.is_set() and self._pcm.empty()
+                ready = len(self._buffer) >= self.window and self._new_samples >= HOLDBACK_SECONDS * SAMPLE_RATE
+                if ready or (final and len(self._buffer)):
+                    self._new_samples = 0
+                    self._transcribe_window(model, final)
+                if final:
+                    break
+        except Exception as e:
+            logger.error(f"Live transcription failed: {e}")
+            self.recorder.remove_listener(self._pcm.put)
+        finally:
+            # Always end the stream, or the emit thread and stop() would wait forever
+            self._pending.put(None)
+
+    def _transcribe_window(self, model, final: bool):
+        offset = self._buffer_start / SAMPLE_RATE
+        with whisper_lock(self.model_size):
+            result = model.transcribe(self._buffer, beam_size=5, word_timestamps=True, fp16=False,
+                                      condition_on_previous_text=False, initial_prompt=self._context or None)
+        window_end = len(self._buffer) / SAMPLE_RATE
+        segments = result.get("segments", [])
+        if final:
+            commit, committed_until = segments, window_end
+        else:
+            commit = list(takewhile(lambda seg: seg["end"] <= window_end - HOLDBACK_SECONDS, segments))
+            committed_until = commit[-1]["end"] if commit else 0.0
+            if not commit and window_end >= 2 * self.window / SAMPLE_RATE:
+                # No segment boundary found in a long stretch: commit most of it anyway, emitting
+                # every segment that starts in the audio about to be dropped
+                forced = window_end - HOLDBACK_SECONDS
+                commit = [seg for seg in segments if seg["start"] < forced]
+                committed_until = max([forced] + [seg["end"] for seg in commit])
+
+        for seg in commit:
+            text = seg["text"].strip()
+            if not text:
+                continue
+            self._context = (self._context + " " + text)[-CONTEXT_CHARS:]
+            segment = {
+                "start": format_time(offset + seg["start"]),
+                "end": format_time(offset + seg["end"]),
+                "text": text,
+                "confidence": round(AudioTranscriber._segment_conf(seg), 4),
+                "words": format_words(seg.get("words", []), offset),
+            }
+            # Wall-clock moment the segment's audio was spoken, assuming real-time capture
+            spoken_at = self._started + offset + seg["end"]
+            self._pending.put((segment, spoken_at, self._pool.submit(self._classify, segment)))
+
+        drop = int(committed_until * SAMPLE_RATE)
+        self._buffer = self._buffer[drop:]
+        self._buffer_start += drop
+
+    def _classify(self, segment: dict) -> dict:
+        result = classify_segment(segment["text"], self.topics)
+        classified = dict(segment, sensitivity=result["sensitivity"], rationale=result["reason"])
+        label = result["sensitivity"].lower()
+        if label == "critical":
+            classified["redacted_text"] = "[[REDACTED]]"
+        elif label == "warning":
+            classified["redacted_text"] = rephrase_warning_text(segment["text"])
+        else:
+            classified["redacted_text"] = segment["text"]
+        return classified
+
+    def _emit_loop(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                self._out.put(None)
+                return
+            _, spoken_at, future = item
+            try:
+                segment = future.result()
+            except Exception as e:
+                logger.error(f"Live classification failed, segment dropped: {e}")
+                continue
+            self.latencies.append(time.monotonic() - spoken_at)
+            self.segments.append(segment)
+            self._out.put(segment)
+            if self.on_segment:
+                try:
+                    self.on_segment(segment)
+                except Exception as e:
+                    logger.error(f"Live segment callback failed: {e}")
+
+    def iter_segments(self):
+        """Yield redacted segments as they are finalised, until the stream ends."""
+        while True:
+            segment = self._out.get()
+            if segment is None:
+                return
+            yield segment
+
+    def stop(self, audio_path: Path | None = None) -> Path | None:
+        """Finish the stream and write outputs; call after ``recorder.stop_recording()``.
+
+        Returns the transcript JSON path, or None if nothing was said.
+        """
+        self.recorder.remove_listener(self._pcm.put)
+        self._stopping.set()
+        self._asr_thread.join()
+        self._emit_thread.join()
+        self._pool.shutdown()
+
+        if audio_path:
+            timestamp = extract_timestamp_from_filename(Path(audio_path).name)
+        else:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        data = {
+            "file": str(audio_path) if audio_path else "",
+            "segments": [{k: v for k, v in seg.items() if k != "redacted_text"} for seg in self.segments],
+            "raw_text": " ".join(seg["text"] for seg in self.segments),
+            "live_stats": {
+                "segments": len(self.segments),
+                "max_latency_seconds": round(max(self.latencies, default=0.0), 2),
+                "mean_latency_seconds": round(sum(self.latencies) / len(self.latencies), 2) if self.latencies else 0.0,
+            },
+        }
+        logger.info(f"Live redaction finished: {data['live_stats']}")
+        if not self.segments:
+            return None
+        transcript_path = AUDIO_FILES_DIR / f"{Path(audio_path).stem if audio_path else 'live_' + timestamp}.json"
+        save_json(transcript_path, data)
+        # Segments were already redacted as they arrived; don't rephrase the Warnings again
+        redacted = [dict({k: v for k, v in seg.items() if k != "redacted_text"}, text=seg["redacted_text"])
+                    for seg in self.segments]
+        write_outputs(data, self.topics, timestamp, redacted_segments=redacted)
+        return transcript_path
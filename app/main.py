@@ -3,19 +3,33 @@ os.environ["STREAMLIT_WATCH_USE_POLLING"] = "true"
 
 import streamlit as st
 from pathlib import Path
-import re
 import json
 import shutil
-import json
+import hashlib
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from audio_input.Audio_Recording import AudioInputManager
-from audio_input.Transcriber import AudioTranscriber
-from text_input.llm_handler import enrich_and_redact_segments
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[1]))
+from app.audio_input.Audio_Recording import AudioInputManager
+from app.audio_input.Transcriber import AudioTranscriber
+from app.pipeline import run_pipeline
+from app.job_client import JobClient
+from app.live_redaction import LiveRedactor
+from app.batch_runner import output_key
+from app.text_input.llm_handler import normalize_topics
 from utils.logger import logger
 from utils.paths import AUDIO_FILES_DIR, LOG_FILE, OUTPUT_DIR,TEMP_DIR
-from utils.helpers import generate_pdf, convert_mp4_to_mp3, generate_segment_audit_pdf
+from utils.helpers import generate_pdf, generate_segment_audit_pdf
+from utils.model_registry import get_whisper
+
+MODEL_SIZE = "base"
+JOB_WORKERS = 2          # pipeline jobs run at once across all sessions
+POLL_SECONDS = 0.5
+STALE_SESSION_SECONDS = 3600   # upload staging dirs older than this are left over from a crash
+STAGE_VERBS = {"transcribe": "transcribed", "classify": "classified", "redact": "redacted"}
 
 # ---------------------------
 # App Setup
@@ -24,53 +38,170 @@ st.set_page_config(page_title="Smart Audio Redactor", layout="wide")
 st.title("🔐 Smart Audio Privacy Filter")
 st.markdown("Upload a conversation or meeting recording to detect and redact sensitive information based on your topics.")
 
+
+# ---------------------------
+# Shared Resources (one per server process, not per session or rerun)
+# ---------------------------
+@st.cache_resource
+def load_whisper(model_size: str = MODEL_SIZE):
+    return get_whisper(model_size)
+
+
+class Job:
+    """One pipeline run, shared by every session and rerun that asks for the same upload and topics."""
+
+    def __init__(self, key: str, future=None):
+        self.key = key
+        self.future = future
+        self.progress = {}
+        self.stage = "queued"
+
+
+class JobRunner:
+    """Background executor plus a memo of jobs keyed by (content hash, topics)."""
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="streamlit-job")
+        self.jobs: dict[tuple, Job] = {}
+        self.latest: dict[str, tuple] = {}     # output key -> memo of the last job that wrote its files
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+
+    def submit(self, input_path: Path, key: str, topics: list[str]) -> Job:
+        memo = (key, tuple(normalize_topics(topics)))
+        with self._lock:
+            job = self.jobs.get(memo)
+            # Reuse unless the run failed or a run with other topics has since rewritten the outputs;
+            # the pipeline's manifest keeps such a re-run incremental
+            if job and self.latest.get(key) == memo and not (job.future.done() and job.future.exception()):
+                return job
+            job = self.jobs[memo] = Job(key)
+            self.latest[key] = memo
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+            job.future = self.executor.submit(self._run, job, input_path, topics, key_lock)
+        return job
+
+    def _run(self, job: Job, input_path: Path, topics: list[str], key_lock: threading.Lock):
+        # Runs for different topics on the same upload share output files, so they take turns
+        with key_lock:
+            client = JobClient()
+            if client.is_available():
+                # A local job server already has the models loaded
+                def on_status(status):
+                    job.stage = status["status"]
+                    job.progress.update({k: v for k, v in status["progress"].items() if k in STAGE_VERBS})
+                status = client.wait(client.submit(input_path, topics)["id"], on_status=on_status)
+                if status["status"] != "done":
+                    raise RuntimeError(f"Processing {status['status']}: {status.get('error') or ''}")
+                return Path(status["outputs"]["transcript"]), status["key"]
+
+            def on_event(kind, payload):
+                if kind == "segment":
+                    stage, index = payload
+                    job.progress[stage] = index + 1
+                elif kind == "stage" and payload[1] == "started":
+                    job.stage = payload[0]
+
+            # Only the in-process fallback needs Whisper here; a job server keeps its own copy warm
+            job.stage = "loading model"
+            load_whisper(MODEL_SIZE)
+            result = run_pipeline(input_path, topics, transcriber=AudioTranscriber(MODEL_SIZE),
+                                  save_directory=AUDIO_FILES_DIR, output_key=job.key, on_event=on_event)
+            if not result:
+                raise RuntimeError("Failed to transcribe audio.")
+            return result.transcript_path, result.timestamp
+
+
+@st.cache_resource
+def get_job_runner() -> JobRunner:
+    return JobRunner()
+
+
+@st.cache_resource
+def sweep_stale_session_dirs(max_age_seconds: float = STALE_SESSION_SECONDS):
+    """Once per server start, remove staging directories left behind by crashed or older sessions."""
+    cutoff = time.time() - max_age_seconds
+    for path in TEMP_DIR.glob("session_*"):
+        if path.is_dir() and path.stat().st_mtime < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+sweep_stale_session_dirs()
+
+
 # ---------------------------
 # Session State Defaults
 # ---------------------------
 if "recorder" not in st.session_state:
     st.session_state.recorder = AudioInputManager(base_directory=AUDIO_FILES_DIR)
-if "transcriber" not in st.session_state:
-    st.session_state.transcriber = AudioTranscriber()
-
-recorder = st.session_state.recorder
-transcriber = st.session_state.transcriber
 
 state = st.session_state
 state.setdefault("is_recording", False)
 state.setdefault("recorded_path", None)
 state.setdefault("transcription_result", "")
 state.setdefault("saved_uploaded_path", None)
+state.setdefault("live", None)
 
 logger.info("App loaded successfully.")
-logger.info("Recorder and Transcriber instantiated.")
 
 # ---------------------------
 # Process Function (Reusable)
 # ---------------------------
 
-def process_audio_file(input_path, topics,label):
-    with st.spinner("Transcribing audio..."):
-        transcription_file = state.transcriber.transcribe_audio(input_path, save_directory=AUDIO_FILES_DIR)
+def save_upload(uploaded_file) -> tuple[Path, str]:
+    """Store an upload once under a name derived from its content; reruns find it already there."""
+    content = uploaded_file.getbuffer()
+    key = f"upload_{hashlib.sha256(content).hexdigest()[:16]}"
+    saved_path = AUDIO_FILES_DIR / f"{key}{Path(uploaded_file.name).suffix.lower()}"
+    if not saved_path.exists():
+        # Staged in a private directory, removed on exit, so concurrent sessions never share files
+        with tempfile.TemporaryDirectory(prefix="session_", dir=TEMP_DIR) as temp_dir:
+            temp_raw = Path(temp_dir) / saved_path.name
+            temp_raw.write_bytes(content)
+            # Atomic on the same filesystem, so another session never sees a half-written file
+            shutil.move(temp_raw, saved_path)
+        logger.info(f"File uploaded: {uploaded_file.name} -> {saved_path.name}")
+    return saved_path, key
+
+
+def wait_for_job(job: Job):
+    """Show a progress bar until the background job finishes; reruns re-attach to the same job."""
+    if not job.future.done():
+        bar = st.progress(0.0, text="Queued...")
+        while not job.future.done():
+            counts = ", ".join(f"{verb} {job.progress[stage]}" for stage, verb in STAGE_VERBS.items()
+                               if stage in job.progress)
+            done = job.progress.get("redact", 0) / max(job.progress.get("transcribe", 0), 1)
+            bar.progress(min(done, 0.99), text=f"{job.stage.capitalize()}... {counts} segments")
+            time.sleep(POLL_SECONDS)
+        bar.empty()
+    return job.future.result()
+
+
+def render_pdf(source: Path, pdf: Path, render):
+    """Regenerate a PDF only when its source is newer than the copy from a previous rerun."""
+    if pdf.exists() and pdf.stat().st_mtime >= source.stat().st_mtime:
+        return
+    render(source, pdf)
+
+
+def process_audio_file(input_path, topics, label, key=None):
     logger.info(f"Transcribing {label} file: {input_path.name}")
-    state.transcription_result = transcription_file
-    transcription_file = AUDIO_FILES_DIR / f"{input_path.stem}.json"
-    if not transcription_file or not Path(transcription_file).exists():
-        st.error("Failed to transcribe audio.")
+    job = get_job_runner().submit(input_path, key or output_key(input_path), topics)
+    try:
+        transcript_path, timestamp = wait_for_job(job)
+    except Exception as e:
+        st.error(str(e))
         return
+    state.transcription_result = str(transcript_path)
 
-    json_output_path = Path(transcription_file)
-    with json_output_path.open("r", encoding="utf-8") as f:
+    with transcript_path.open("r", encoding="utf-8") as f:
         data = json.load(f)
         lang = data.get("language", "unknown").upper()
         st.info(f"🈯 Detected Language: {lang}")
         if data.get("language_warning", {}).get("triggered"):
             st.warning(f"⚠️ {data['language_warning']['message']}")
 
-    enrich_and_redact_segments(json_output_path, topics)
-
-    match = re.search(r'(\d{8}_\d{6})', json_output_path.stem)
-    timestamp = match.group(1) if match else "latest"
-
     redacted_txt = OUTPUT_DIR / f"redacted_text_{timestamp}.txt"
     redacted_pdf = OUTPUT_DIR / f"redacted_text_{timestamp}.pdf"
     report_txt = OUTPUT_DIR / f"privacy_report_{timestamp}.txt"
@@ -78,30 +209,29 @@ def process_audio_file(input_path, topics,label):
     classified_json = OUTPUT_DIR / f"classified_transcript_{timestamp}.json"
     segment_audit_pdf = OUTPUT_DIR / f"classified_transcript_{timestamp}.pdf"
 
+    text_to_pdf = lambda src, pdf: generate_pdf(src.read_text(encoding="utf-8"), pdf)
     if redacted_txt.exists():
         try:
-            with open(redacted_txt, "r", encoding="utf-8") as f:
-                redacted_content = f.read()
-            generate_pdf(redacted_content, redacted_pdf)
+            render_pdf(redacted_txt, redacted_pdf, text_to_pdf)
         except Exception as e:
             st.error(f"PDF generation failed: {e}")
 
+    summary_text = ""
     if report_txt.exists():
         try:
-            with open(report_txt, "r", encoding="utf-8") as f:
-                summary_text = f.read()
-            generate_pdf(summary_text, report_pdf)
+            summary_text = report_txt.read_text(encoding="utf-8")
+            render_pdf(report_txt, report_pdf, text_to_pdf)
         except Exception as e:
             st.error(f"Report generation failed: {e}")
 
     if classified_json.exists():
         try:
-            generate_segment_audit_pdf(classified_json, segment_audit_pdf)
+            render_pdf(classified_json, segment_audit_pdf, generate_segment_audit_pdf)
         except Exception as e:
             st.error(f"Audit log generation failed: {e}")
 
     st.subheader("📊 Privacy Summary")
-    if report_txt.exists():
+    if summary_text:
         for line in summary_text.splitlines():
             if line.startswith("- Redacted"):
                 st.error(line)
@@ -137,44 +267,33 @@ if submitted:
     st.success("Topics updated.")
 
 if uploaded_file:
-    temp_raw = TEMP_DIR / uploaded_file.name
-    temp_raw.write_bytes(uploaded_file.getbuffer())
-    logger.info(f"File uploaded: {uploaded_file.name}")
-    file_ext = temp_raw.suffix.lower()
-
-    st.audio(str(temp_raw))
-
-    if file_ext == ".mp4":
-        mp3_path = temp_raw.with_suffix(".mp3")
-        converted_path = convert_mp4_to_mp3(temp_raw, mp3_path)
-        if not converted_path:
-            st.error("Failed to convert MP4 to MP3.")
-            st.stop()
-        st.success(f"Converted MP4 to MP3: {converted_path.name}")
-        temp_path = converted_path
-    else:
-        temp_path = temp_raw
-
-    st.audio(str(temp_raw))
-    # 📥 Register using AudioInputManager
-    saved_path = Path(recorder.accept_pre_recorded_file(temp_raw))
-    state.saved_uploaded_path = saved_path
+    # MP4 and other containers are decoded straight to PCM by the transcriber
+    st.audio(uploaded_file)
+    saved_path, upload_key = save_upload(uploaded_file)
+    if state.saved_uploaded_path != saved_path:
+        state.saved_uploaded_path = saved_path
+        with LOG_FILE.open("a") as log:
+            log.write(f"{datetime.now()} - Uploaded : {uploaded_file.name} -> {saved_path.name}\n")
     st.success(f"File accepted and ready: {saved_path.name}")
 
-    process_audio_file(saved_path, [t.strip() for t in user_topics.split(",") if t.strip()],label="Uploaded")
-    with LOG_FILE.open("a") as log:
-        log.write(f"{datetime.now()} - Uploaded : {uploaded_file.name} -> Processed\n")
-    shutil.rmtree(TEMP_DIR)
+    process_audio_file(saved_path, [t.strip() for t in user_topics.split(",") if t.strip()],
+                       label="Uploaded", key=upload_key)
 # ---------------------------
 # Live Microphone Recording
 # ---------------------------
 st.header("🎙️ Live Microphone Recording")
+live_mode = st.checkbox("Redact live while recording", value=True, disabled=state.is_recording)
 col1, col2 = st.columns(2)
 
 with col1:
     if st.button("Start Recording", disabled=state.is_recording):
         try:
+            if live_mode:
+                topics = [t.strip() for t in user_topics.split(",") if t.strip()]
+                state.live = LiveRedactor(state.recorder, topics, MODEL_SIZE)
             state.recorder.start_recording()
+            if state.live:
+                state.live.start()
             state.is_recording = True
             logger.info("Live recording started.")
             st.success("Recording started — speak now …")
@@ -186,6 +305,15 @@ with col2:
         try:
             raw_result = state.recorder.stop_recording()
             state.is_recording = False
+            if state.live:
+                live, state.live = state.live, None
+                with st.spinner("Finishing live redaction..."):
+                    live_transcript = live.stop(raw_result)
+                if live_transcript:
+                    st.subheader("📝 Live Redacted Transcript")
+                    for seg in live.segments:
+                        st.write(f"[{seg['start']}] {seg['redacted_text']}")
+                    st.success(f"Outputs saved in: {OUTPUT_DIR}")
             if not raw_result:
                 st.warning("No audio recorded.")
                 st.stop()
@@ -197,6 +325,6 @@ with col2:
             st.success(f"Recorded audio saved: {persistent_path.name}")
 
             if st.button("Transcribe & Redact Recording"):
-                process_audio_file(persistent_path, [t.strip() for t in user_topics.split(",") if t.strip()])
+                process_audio_file(persistent_path, [t.strip() for t in user_topics.split(",") if t.strip()], label="Recorded")
         except Exception as e:
             st.error(f"Stop/Transcribe failed: {e}")
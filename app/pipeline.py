@@ -0,0 +1,295 @@
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from utils.logger import logger
+from utils.paths import AUDIO_DATA_DIR, OUTPUT_DIR
+from utils.json_io import load_json
+from utils.manifest import hash_file, load_manifest, save_manifest, stage_is_current, record_stage, log_reused
+from app.audio_input.Transcriber import AudioTranscriber
+from app.audio_input.transcript_cache import TRANSCRIPT_SCHEMA
+from app.text_input.llm_handler import (classify_segment_windows, Rephraser, write_outputs,
+                                        extract_timestamp_from_filename, enrich_and_redact_segments,
+                                        classify_stage_inputs, apply_classification, redact_critical_text)
+from app.text_input.llm_cache import get_cache
+from app.text_input.ollama_client import MAX_IN_FLIGHT
+
+QUEUE_SIZE = 64          # max items buffered between two stages
+MICRO_BATCH = 16         # segments the classifier takes from its queue per pass
+_DONE = object()
+
+
+@dataclass
+class PipelineResult:
+    transcript_path: Path
+    timestamp: str
+    outputs: dict = field(default_factory=dict)
+    stage_seconds: dict = field(default_factory=dict)
+    segments: int = 0
+    reused: list = field(default_factory=list)
+
+
+class _Abort:
+    """Stop flag for one run. Stages set it when they fail; the caller's ``cancel`` event also
+    trips it, but a failure never sets ``cancel``, so callers can tell the two apart."""
+
+    def __init__(self, cancel: threading.Event | None = None):
+        self._failed = threading.Event()
+        self._cancel = cancel
+
+    def set(self):
+        self._failed.set()
+
+    def is_set(self) -> bool:
+        return self._failed.is_set() or (self._cancel is not None and self._cancel.is_set())
+
+
+class _Stage(threading.Thread):
+    """A pipeline stage running on its own thread, tracking time spent working vs waiting."""
+
+    def __init__(self, name: str, target, errors: list, abort: _Abort):
+        super().__init__(name=f"pipeline-{name}", daemon=True)
+        self.stage_name = name
+        self._target = target
+        self._errors = errors
+        self._abort = abort
+        self.busy = 0.0
+
+    def run(self):
+        try:
+            self._target(self)
+        except Exception as e:
+            logger.error(f"Pipeline stage '{self.stage_name}' failed: {e}")
+            self._errors.append(e)
+            self._abort.set()
+
+
+def _put(q: queue.Queue, item, abort: _Abort) -> bool:
+    """Blocking put that gives up once another stage has failed."""
+    while not abort.is_set():
+        try:
+            q.put(item, timeout=0.5)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def run_pipeline(audio_path, topics: list[str], transcriber: AudioTranscriber | None = None,
+                 save_directory=AUDIO_DATA_DIR, vad: bool = False, use_cache: bool = True,
+                 max_workers: int = MAX_IN_FLIGHT, batch_token_budget: int | None = None,
+                 prefilter_threshold: float | None = None, output_key: str | None = None,
+                 pii_rules: str | None = None, rephrase_batch_size: int | None = None,
+                 window_tokens: int | None = None, on_event=None,
+                 cancel: threading.Event | None = None) -> PipelineResult | None:
+    """Transcribe -> classify -> redact with the stages overlapping through bounded queues.
+
+    Classification starts on the first segments Whisper produces and redaction starts
+    on the first classified ones. ``on_event(kind, payload)`` receives progress events:
+    ("stage", (name, "started"|"finished")) and ("segment", (stage, index)). Setting
+    ``cancel`` stops every stage at its next item and makes the call return None.
+
+    Stage inputs are recorded in the run manifest. If the audio and transcription options
+    are unchanged since the last run, the existing transcript is reused and only the later
+    stages whose inputs changed are recomputed.
+    """
+    audio_path = Path(audio_path)
+    transcriber = transcriber or AudioTranscriber()
+    timestamp = output_key or extract_timestamp_from_filename(audio_path.name)
+    manifest = load_manifest(timestamp)
+    transcribe_inputs = {"audio": hash_file(audio_path), "model": transcriber.model_size, "vad": vad,
+                         "schema": TRANSCRIPT_SCHEMA}
+    if cancel and cancel.is_set():
+        return None
+    if stage_is_current(manifest, "transcribe", transcribe_inputs):
+        return _run_incremental(manifest, timestamp, topics, emit=on_event or (lambda kind, payload: None),
+                                max_workers=max_workers, batch_token_budget=batch_token_budget,
+                                prefilter_threshold=prefilter_threshold, pii_rules=pii_rules,
+                                rephrase_batch_size=rephrase_batch_size, window_tokens=window_tokens)
+
+    emit = on_event or (lambda kind, payload: None)
+    transcribed, classified = queue.Queue(QUEUE_SIZE), queue.Queue(QUEUE_SIZE)
+    classified_segments: list[dict] = []
+    redacted: list[dict] = []
+    errors: list[Exception] = []
+    abort = _Abort(cancel)
+    counts = {"transcribe": 0, "classify": 0, "redact": 0, "windows": 0}
+
+    def transcribe(stage):
+        emit("stage", ("transcribe", "started"))
+        mark = time.perf_counter()
+        try:
+            for seg in transcriber.iter_segments(str(audio_path), save_directory=save_directory,
+                                                 vad=vad, use_cache=use_cache, transcript_name=output_key):
+                stage.busy += time.perf_counter() - mark
+                if not _put(transcribed, seg, abort):
+                    break
+                emit("segment", ("transcribe", counts["transcribe"]))
+                counts["transcribe"] += 1
+                mark = time.perf_counter()
+        finally:
+            _put(transcribed, _DONE, abort)
+            emit("stage", ("transcribe", "finished"))
+
+    def classify(stage):
+        emit("stage", ("classify", "started"))
+        try:
+            _classify_loop(stage)
+        finally:
+            _put(classified, _DONE, abort)
+        emit("stage", ("classify", "finished"))
+
+    def _classify_loop(stage):
+        done = False
+        while not done and not abort.is_set():
+            try:
+                batch = [transcribed.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            while len(batch) < MICRO_BATCH:
+                try:
+                    batch.append(transcribed.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _DONE:
+                batch.pop()
+                done = True
+            if not batch:
+                continue
+            start = time.perf_counter()
+            results, stats = classify_segment_windows(batch, topics, window_tokens, first_window=counts["windows"],
+                                                      max_workers=max_workers, batch_token_budget=batch_token_budget,
+                                                      prefilter_threshold=prefilter_threshold, pii_rules=pii_rules)
+            counts["windows"] += stats.get("windowing", {}).get("windows", 0)
+            stage.busy += time.perf_counter() - start
+            for seg, result in zip(batch, results):
+                seg = apply_classification(dict(seg), result)
+                if seg["sensitivity"] == "Warning":
+                    rephraser.prefetch(seg["text"])   # start rewriting before the redact stage dequeues it
+                classified_segments.append(seg)
+                if not _put(classified, seg, abort):
+                    return
+                emit("segment", ("classify", counts["classify"]))
+                counts["classify"] += 1
+
+    def redact(stage):
+        emit("stage", ("redact", "started"))
+        in_flight = deque()
+
+        def _finish_oldest():
+            seg, future = in_flight.popleft()
+            start = time.perf_counter()
+            text = future.result() if future else seg["text"]
+            stage.busy += time.perf_counter() - start
+            redacted.append(dict(seg, text=text))
+            emit("segment", ("redact", counts["redact"]))
+            counts["redact"] += 1
+
+        while not abort.is_set():
+            try:
+                seg = classified.get(timeout=0.5)
+            except queue.Empty:
+                # Nothing new to wait for: send any partly filled rephrase batch
+                rephraser.flush()
+                continue
+            if seg is _DONE:
+                break
+            label = seg.get("sensitivity", "").lower()
+            if label == "critical":
+                in_flight.append((dict(seg, text=redact_critical_text(seg)), None))
+            elif label == "warning":
+                in_flight.append((seg, rephraser.submit(seg["text"])))
+            else:
+                in_flight.append((seg, None))
+            # Emit in order, without blocking on anything still being rephrased
+            while in_flight and (in_flight[0][1] is None or in_flight[0][1].done()):
+                _finish_oldest()
+        rephraser.flush()
+        while in_flight and not abort.is_set():
+            _finish_oldest()
+        emit("stage", ("redact", "finished"))
+
+    transcriber.transcription_file = None
+    wall_start = time.perf_counter()
+    rephraser = Rephraser(max_workers, rephrase_batch_size)
+    stages = [_Stage("transcribe", transcribe, errors, abort), _Stage("classify", classify, errors, abort),
+              _Stage("redact", redact, errors, abort)]
+    for stage in stages:
+        stage.start()
+    for stage in stages:
+        stage.join()
+    rephraser.close()
+    if cancel and cancel.is_set() and not errors:
+        logger.info(f"Pipeline cancelled for {audio_path.name}")
+        return None
+    if errors or not transcriber.transcription_file:
+        logger.error("Pipeline aborted: transcription failed or produced no file.")
+        return None
+    if not redacted:
+        logger.warning("No speech detected in audio.")
+        return None
+
+    transcript_path = Path(transcriber.transcription_file)
+    record_stage(manifest, "transcribe", transcribe_inputs, {"transcript": transcript_path})
+    save_manifest(timestamp, manifest)
+    emit("stage", ("outputs", "started"))
+    output_start = time.perf_counter()
+    data = load_json(transcript_path, default={})
+    classify_inputs = classify_stage_inputs(data.get("segments", []), topics, prefilter_threshold, pii_rules,
+                                            window_tokens)
+    data["segments"] = classified_segments
+    reused = write_outputs(data, topics, timestamp, redacted_segments=redacted, classify_inputs=classify_inputs,
+                           rephraser=rephraser)
+    output_seconds = time.perf_counter() - output_start
+    emit("stage", ("outputs", "finished"))
+
+    stage_seconds = {stage.stage_name: round(stage.busy, 2) for stage in stages}
+    stage_seconds["outputs"] = round(output_seconds, 2)
+    stage_seconds["wall"] = round(time.perf_counter() - wall_start, 2)
+    logger.info(f"Pipeline stage times (s): {stage_seconds}")
+    log_reused(timestamp, reused)
+    get_cache().log_stats()
+
+    return PipelineResult(
+        transcript_path=transcript_path,
+        timestamp=timestamp,
+        outputs=_output_paths(timestamp),
+        stage_seconds=stage_seconds,
+        segments=len(redacted),
+        reused=reused,
+    )
+
+
+def _output_paths(timestamp: str) -> dict:
+    return {
+        "classified_json": OUTPUT_DIR / f"classified_transcript_{timestamp}.json",
+        "redacted_json": OUTPUT_DIR / f"redacted_transcript_{timestamp}.json",
+        "redacted_text": OUTPUT_DIR / f"redacted_text_{timestamp}.txt",
+        "privacy_report": OUTPUT_DIR / f"privacy_report_{timestamp}.txt",
+    }
+
+
+def _run_incremental(manifest: dict, timestamp: str, topics: list[str], emit, **classify_options) -> PipelineResult | None:
+    """Re-run only the stages after an unchanged transcript; there is nothing left to overlap."""
+    transcript_path = Path(manifest["stages"]["transcribe"]["outputs"]["transcript"]["path"])
+    logger.info(f"Audio unchanged since last run; reusing transcript {transcript_path.name}")
+    emit("stage", ("outputs", "started"))
+    start = time.perf_counter()
+    reused = enrich_and_redact_segments(transcript_path, topics, output_key=timestamp, **classify_options)
+    emit("stage", ("outputs", "finished"))
+    if reused is None:
+        return None
+    return PipelineResult(
+        transcript_path=transcript_path,
+        timestamp=timestamp,
+        outputs=_output_paths(timestamp),
+        stage_seconds={"outputs": round(time.perf_counter() - start, 2)},
+        segments=len(load_json(transcript_path, default={}).get("segments", [])),
+        reused=["transcribe"] + reused,
+    )
+
@@ -1,27 +1,30 @@
-import requests
 import json
-from sentence_transformers import SentenceTransformer
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import numpy as np
 from pathlib import Path
 import sys
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from utils.logger import logger
-from utils.paths import PHRASE_DIR,PHRASE_BANK_PATH, EMBED_CACHE_PATH, OLLAMA_URL
+from utils.paths import PHRASE_DIR,PHRASE_BANK_PATH, EMBED_CACHE_PATH, EMBED_MATRIX_PATH, EMBED_META_PATH
 from utils.json_io import load_json, save_json
+from utils.model_registry import get_embedder
+from .ollama_client import generate, MAX_IN_FLIGHT, REQUEST_TIMEOUT, BACKOFF_BASE
 
 # Ensure Embeddings directory exists
 PHRASE_DIR.parent.mkdir(parents=True, exist_ok=True)
 
-model = SentenceTransformer("all-MiniLM-L6-v2")
+# Storage precision of the phrase matrix; "float16" halves the file size
+EMBED_DTYPE = "float32"
+ENCODE_BATCH_SIZE = 256
+PHRASE_MODEL = "phi"
 
 def load_phrase_bank():
     return load_json(PHRASE_BANK_PATH, default={})
 
-import json
-import requests
-from utils.logger import logger
-from utils.paths import OLLAMA_URL
-
 
 def make_prompt(topic: str) -> str:
     return f"""
@@ -47,17 +50,12 @@ Format:
 """
 
 
-def call_ollama(topic: str, retries: int = 2):
+def call_ollama(topic: str, retries: int = 2, timeout: float = REQUEST_TIMEOUT, backoff: float = BACKOFF_BASE):
     prompt = make_prompt(topic)
 
     for attempt in range(retries + 1):
         try:
-            response = requests.post(OLLAMA_URL, json={"model": "phi", "prompt": prompt, "stream": False})
-            if response.status_code != 200:
-                logger.error(f" Ollama returned status {response.status_code}: {response.text}")
-                continue
-
-            raw = response.json().get("response", "")
+            raw = generate(prompt, PHRASE_MODEL, timeout=timeout, retries=0)
             json_start = raw.find("{")
             json_end = raw.rfind("}") + 1
             json_data = raw[json_start:json_end]
@@ -72,41 +70,153 @@ def call_ollama(topic: str, retries: int = 2):
 
         except Exception as e:
             logger.error(f" Attempt {attempt + 1}: Failed to parse Ollama response for topic '{topic}': {e}")
+            if attempt < retries:
+                time.sleep(backoff * (2 ** attempt))
 
     # Fallback if all attempts fail
     logger.warning(f"⚠️ Returning empty structure for topic '{topic}' after {retries + 1} attempts.")
     return {"Safe": [], "Warning": [], "Critical": []}
 
 
-def build_embedding_index(phrase_bank):
-    index = {"Safe": [], "Warning": [], "Critical": []}
+def save_phrase_bank(phrase_bank):
+    # Write to a temp file first so an interrupted run never leaves a truncated bank
+    tmp_path = PHRASE_BANK_PATH.with_suffix(".tmp.json")
+    save_json(tmp_path, phrase_bank)
+    tmp_path.replace(PHRASE_BANK_PATH)
+
+
+def phrase_hash(phrase: str) -> str:
+    return hashlib.sha256(phrase.strip().encode("utf-8")).hexdigest()[:20]
+
+
+def build_embedding_index(phrase_bank, existing=None):
+    """Build (matrix, meta) for ``phrase_bank``, reusing vectors from ``existing`` by phrase hash.
+
+    Only phrases missing from the existing store are encoded, in one batched call.
+    Rows for topics no longer in the phrase bank are dropped.
+    """
+    old_matrix, old_meta = existing if existing is not None else (None, [])
+    old_rows = {}
+    if old_matrix is not None:
+        for i, m in enumerate(old_meta):
+            old_rows.setdefault(m.get("hash") or phrase_hash(m["phrase"]), i)
+
+    meta = []
     for topic, categories in phrase_bank.items():
         for category, phrases in categories.items():
             for phrase in phrases:
-                emb = model.encode(phrase, normalize_embeddings=True)
-                index[category].append({
-                    "phrase": phrase,
-                    "embedding": emb.tolist(),
-                    "topic": topic,
-                    "category": category,
-                    "match_score": 0.0
-                })
-    logger.info(" Built embedding index from phrase bank.")
-    return index
-
-def generate_and_embed(user_topics):
+                meta.append({"phrase": phrase, "topic": topic, "category": category, "hash": phrase_hash(phrase)})
+
+    model = get_embedder()
+    dim = model.get_sentence_embedding_dimension()
+    matrix = np.zeros((len(meta), dim), dtype=EMBED_DTYPE)
+    to_encode = {}
+    reused = 0
+    for i, m in enumerate(meta):
+        if m["hash"] in old_rows:
+            matrix[i] = old_matrix[old_rows[m["hash"]]]
+            reused += 1
+        else:
+            to_encode.setdefault(m["hash"], (m["phrase"], []))[1].append(i)
+
+    if to_encode:
+        phrases = [phrase for phrase, _ in to_encode.values()]
+        vectors = model.encode(phrases, batch_size=ENCODE_BATCH_SIZE, normalize_embeddings=True,
+                               convert_to_numpy=True)
+        for vector, (_, rows) in zip(vectors, to_encode.values()):
+            matrix[rows] = vector
+
+    logger.info(f" Built embedding index: {reused} vectors reused, {len(to_encode)} computed, "
+                f"{len(meta)} rows total.")
+    return matrix, meta
+
+
+def save_embedding_store(matrix: np.ndarray, meta: list[dict], dtype: str = EMBED_DTYPE):
+    """Write the phrase matrix as .npy and its phrase/topic/category table as JSON."""
+    tmp_path = EMBED_MATRIX_PATH.with_suffix(".tmp.npy")
+    np.save(tmp_path, np.ascontiguousarray(matrix, dtype=dtype))
+    tmp_path.replace(EMBED_MATRIX_PATH)
+    save_json(EMBED_META_PATH, meta)
+    logger.info(f" Saved {len(meta)} phrase embeddings ({dtype}) to: {EMBED_MATRIX_PATH}")
+
+
+def migrate_json_index():
+    """Convert a legacy phrase_embeddings.json index into the binary store."""
+    index = load_json(EMBED_CACHE_PATH, default={})
+    meta, vectors = [], []
+    for category, entries in index.items():
+        for entry in entries:
+            vectors.append(entry["embedding"])
+            meta.append({"phrase": entry["phrase"], "topic": entry["topic"], "category": category,
+                         "hash": phrase_hash(entry["phrase"])})
+    if not vectors:
+        return False
+    save_embedding_store(np.asarray(vectors, dtype=EMBED_DTYPE), meta)
+    logger.info(f" Migrated {len(meta)} embeddings from legacy JSON index: {EMBED_CACHE_PATH}")
+    return True
+
+
+def load_embedding_store():
+    """Return (matrix, meta); the matrix is memory-mapped read-only from disk."""
+    if not EMBED_MATRIX_PATH.exists() or not EMBED_META_PATH.exists():
+        if not (EMBED_CACHE_PATH.exists() and migrate_json_index()):
+            return None, []
+    matrix = np.load(EMBED_MATRIX_PATH, mmap_mode="r")
+    meta = load_json(EMBED_META_PATH, default=[])
+    if len(meta) != matrix.shape[0]:
+        logger.error(f" Embedding store is inconsistent ({matrix.shape[0]} vectors, {len(meta)} rows).")
+        return None, []
+    return matrix, meta
+
+def generate_and_embed(user_topics, max_workers: int = MAX_IN_FLIGHT):
     phrase_bank = load_phrase_bank()
-
-    for topic in user_topics:
+    missing = []
+    for topic in dict.fromkeys(user_topics):
         if topic not in phrase_bank:
-            logger.info(f" Generating phrases for topic: '{topic}'")
-            phrase_bank[topic] = call_ollama(topic)
+            missing.append(topic)
         else:
             logger.info(f" Topic '{topic}' already cached. Skipping generation.")
 
-    save_json(PHRASE_BANK_PATH, phrase_bank)
-
-    embed_index = build_embedding_index(phrase_bank)
-    save_json(EMBED_CACHE_PATH, embed_index)
+    if missing:
+        lock = threading.Lock()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(missing)))) as pool:
+            futures = {}
+            for topic in missing:
+                logger.info(f" Generating phrases for topic: '{topic}'")
+                futures[pool.submit(call_ollama, topic)] = topic
+            for future in as_completed(futures):
+                topic = futures[future]
+                phrases = future.result()
+                if not any(phrases.values()):
+                    # Leave failed topics out of the bank so the next run retries them
+                    continue
+                with lock:
+                    phrase_bank[topic] = phrases
+                    save_phrase_bank(phrase_bank)
+                logger.info(f" Saved phrases for topic: '{topic}'")
+
+    existing = load_embedding_store()
+    matrix, meta = build_embedding_index(phrase_bank, existing=existing)
+    # Release the memory map before the store file is replaced
+    del existing
+    save_embedding_store(matrix, meta)
 
     logger.info(f"Completed generation and embedding for topics: {list(phrase_bank.keys())}")
+
+
+def remove_topic(topic: str):
+    """Drop a topic from the phrase bank and its rows from the embedding store."""
+    phrase_bank = load_phrase_bank()
+    if phrase_bank.pop(topic, None) is None:
+        logger.info(f" Topic '{topic}' not in phrase bank. Nothing to remove.")
+        return
+    save_phrase_bank(phrase_bank)
+
+    matrix, meta = load_embedding_store()
+    if matrix is None:
+        return
+    keep = [i for i, m in enumerate(meta) if m["topic"] != topic]
+    kept_matrix = np.array(matrix[keep], dtype=matrix.dtype)
+    del matrix
+    save_embedding_store(kept_matrix, [meta[i] for i in keep], dtype=str(kept_matrix.dtype))
+    logger.info(f" Removed topic '{topic}': dropped {len(meta) - len(keep)} embedding rows.")
@@ -0,0 +1,70 @@
+import numpy as np
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from utils.logger import logger
+from utils.model_registry import get_embedder
+
+SAFE_THRESHOLD = 0.35      # segments less similar than this to every risky phrase skip the LLM
+RISKY_CATEGORIES = ("Warning", "Critical")
+
+
+def load_risky_phrase_matrix(topics: list[str]) -> tuple[np.ndarray, list[dict]]:
+    """Select the Warning/Critical phrase rows for ``topics`` from the embedding store."""
+    from .PhraseExpander import load_embedding_store
+
+    matrix, meta = load_embedding_store()
+    if matrix is None:
+        return np.zeros((0, 0), dtype=np.float32), []
+    wanted = {t.lower() for t in topics}
+    rows = [i for i, m in enumerate(meta)
+            if m["category"] in RISKY_CATEGORIES and m["topic"].lower() in wanted]
+    # Fancy indexing copies only the selected rows out of the memory map
+    return np.asarray(matrix[rows], dtype=np.float32), [meta[i] for i in rows]
+
+
+def prefilter_segments(texts: list[str], topics: list[str],
+                       threshold: float = SAFE_THRESHOLD) -> tuple[list[dict | None], dict]:
+    """Auto-label segments that are clearly unrelated to the sensitive topics as Safe.
+
+    Returns one entry per text: a classification dict for skipped segments, or None
+    for segments that still need the LLM, plus per-run stats.
+    """
+    from .PhraseExpander import generate_and_embed
+
+    phrases, meta = load_risky_phrase_matrix(topics)
+    if not meta:
+        generate_and_embed(topics)
+        phrases, meta = load_risky_phrase_matrix(topics)
+
+    stats = {"segments": len(texts), "skipped": 0, "skip_rate": 0.0, "threshold": threshold}
+    if not meta or not texts:
+        logger.warning(" No phrase embeddings available for pre-filter; sending all segments to the LLM.")
+        return [None] * len(texts), stats
+
+    seg_emb = get_embedder().encode(texts, batch_size=64, normalize_embeddings=True, convert_to_numpy=True)
+    # Both sides are L2-normalised, so one matrix product gives every cosine similarity
+    scores = seg_emb.astype(np.float32) @ phrases.T
+    best = scores.argmax(axis=1)
+    best_scores = scores[np.arange(len(texts)), best]
+
+    results: list[dict | None] = []
+    for score, j in zip(best_scores, best):
+        if score < threshold:
+            nearest = meta[j]
+            results.append({
+                "sensitivity": "Safe",
+                "reason": f"Embedding pre-filter: max similarity {score:.2f} to '{nearest['topic']}' "
+                          f"phrases is below {threshold:.2f}.",
+            })
+        else:
+            results.append(None)
+
+    skipped = sum(r is not None for r in results)
+    stats["skipped"] = skipped
+    stats["skip_rate"] = round(skipped / len(texts), 4)
+    logger.info(f" Embedding pre-filter skipped {skipped}/{len(texts)} segments "
+                f"({stats['skip_rate'] * 100:.1f}%) at threshold {threshold:.2f}.")
+    return results, stats
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from utils.logger import logger
+from utils.paths import LLM_CACHE_PATH
+
+MAX_ENTRIES = 50_000   # rows kept before least-recently-used entries are evicted
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def template_hash(template: str) -> str:
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+
+
+def make_key(kind: str, text: str, topics: list[str], model: str, prompt_hash: str) -> str:
+    payload = json.dumps([kind, normalize_text(text), sorted(t.lower() for t in topics), model, prompt_hash])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Content-addressed SQLite cache for LLM results, safe to share between processes."""
+
+    def __init__(self, path: Path = LLM_CACHE_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    last_used REAL NOT NULL
+                )""")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot cross threads, so keep one per thread
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                with conn:
+                    conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            logger.error(f" LLM cache read failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, kind: str, value) -> None:
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache (key, kind, value, last_used) VALUES (?, ?, ?, ?)",
+                    (key, kind, json.dumps(value, ensure_ascii=False), time.time()),
+                )
+            with self._lock:
+                self._writes += 1
+                should_evict = self._writes % 100 == 0
+            if should_evict:
+                self.evict()
+        except sqlite3.Error as e:
+            logger.error(f" LLM cache write failed: {e}")
+
+    def evict(self) -> int:
+        """Drop least-recently-used rows beyond ``max_entries``."""
+        conn = self._connect()
+        with conn:
+            cur = conn.execute("""
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""", (self.max_entries,))
+        if cur.rowcount:
+            logger.info(f" LLM cache evicted {cur.rowcount} entries.")
+        return cur.rowcount
+
+    def log_stats(self, label: str = "LLM cache") -> None:
+        total = self.hits + self.misses
+        rate = (self.hits / total * 100) if total else 0.0
+        logger.info(f" {label}: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
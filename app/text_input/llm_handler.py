@@ -1,6 +1,7 @@
 import json
-import requests
 import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from pathlib import Path
 from datetime import datetime
@@ -10,9 +11,22 @@ import sys
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from utils.logger import logger
-from utils.paths import AUDIO_DATA_DIR, OUTPUT_DIR, OLLAMA_URL
+from utils.paths import AUDIO_DATA_DIR, OUTPUT_DIR
+from utils.json_io import load_json
+from utils.helpers import parse_time
+from utils.manifest import (hash_data, load_manifest, save_manifest, stage_is_current, outputs_intact,
+                            record_stage, log_reused)
+from .ollama_client import generate, MAX_IN_FLIGHT, REQUEST_TIMEOUT, MAX_RETRIES
+from .llm_cache import get_cache, make_key, template_hash, normalize_text
 
 MODEL = "mistral"
+VALID_LABELS = ("Safe", "Warning", "Critical")
+BATCH_TOKEN_BUDGET = 1500   # approx. prompt tokens per batched classification call
+CHARS_PER_TOKEN = 4         # rough estimate used to size batches without a tokenizer
+SEVERITY = {label: rank for rank, label in enumerate(VALID_LABELS)}
+REPHRASE_BATCH_SIZE = 8     # sentences per batched rephrase prompt when batching is enabled
+WINDOW_MAX_GAP_SECONDS = 1.5  # a pause longer than this starts a new classification window
+WINDOW_SCHEME = 2             # bump when window labelling changes, so recorded classify stages re-run
 
 def extract_timestamp_from_filename(filename: str) -> str:
     match = re.search(r'(\d{8}_\d{6})', filename)
@@ -39,23 +53,180 @@ Return a JSON object ONLY in this format:
   "reason": "short explanation"
 }}
 """
-def classify_segment(text: str, topics: list[str]) -> dict:
+def classify_cache_key(text: str, topics: list[str], batched: bool = False) -> str:
+    """Cache key for one text's label, tied to the prompt template that produced it."""
+    template = get_batch_classify_prompt([""], []) if batched else get_classify_prompt("", [])
+    return make_key("classify", text, topics, MODEL, template_hash(template))
+
+
+def classify_segment(text: str, topics: list[str], timeout: float = REQUEST_TIMEOUT,
+                     retries: int = MAX_RETRIES) -> dict:
+    cache = get_cache()
+    key = classify_cache_key(text, topics)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
     prompt = get_classify_prompt(text, topics)
     try:
-        response = requests.post(OLLAMA_URL, json={"model": MODEL, "prompt": prompt, "stream": False})
-        output = response.json().get("response", "")
+        output = generate(prompt, MODEL, timeout=timeout, retries=retries)
         json_start = output.find("{")
         json_end = output.rfind("}") + 1
         parsed = json.loads(output[json_start:json_end])
-        return {
+        result = {
             "sensitivity": parsed.get("sensitivity", "Unknown"),
             "reason": parsed.get("reason", "No rationale provided.")
         }
+        if result["sensitivity"] in VALID_LABELS:
+            cache.put(key, "classify", result)
+        return result
     except Exception as e:
         logger.error(f"Classification failed: {text[:40]}... => {e}")
         return {"sensitivity": "Unknown", "reason": f"Parse failure: {e}"}
 
 
+def classify_segments(texts: list[str], topics: list[str], max_workers: int = MAX_IN_FLIGHT,
+                      timeout: float = REQUEST_TIMEOUT, retries: int = MAX_RETRIES,
+                      on_result=None) -> list[dict]:
+    """Classify many texts concurrently; results are returned in input order.
+
+    ``on_result(index, result)`` is called as each classification completes.
+    """
+    results: list[dict | None] = [None] * len(texts)
+    if not texts:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            pool.submit(classify_segment, text, topics, timeout, retries): i
+            for i, text in enumerate(texts)
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Classifying"):
+            i = futures[future]
+            results[i] = future.result()
+            if on_result:
+                on_result(i, results[i])
+    return results
+
+
+def get_batch_classify_prompt(texts: list[str], topics: list[str]) -> str:
+    numbered = "\n".join(f'{i}. "{text}"' for i, text in enumerate(texts, start=1))
+    return f"""
+You are a workplace text(speech) classifier.
+
+Given these numbered messages:
+{numbered}
+
+And the following sensitive topics:
+{topics}
+
+Classify EACH message into one of the following:
+- Safe: harmless, compliant
+- Warning: possibly sensitive, questionable
+- Critical: private, policy-violating, or high-risk
+
+Return a JSON array ONLY, with one object per message, in this format:
+[
+  {{"id": 1, "sensitivity": "Safe" | "Warning" | "Critical", "reason": "short explanation"}}
+]
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def plan_batches(texts: list[str], topics: list[str], token_budget: int = BATCH_TOKEN_BUDGET) -> list[list[int]]:
+    """Group text indices so that each batched prompt stays within ``token_budget``."""
+    overhead = estimate_tokens(get_batch_classify_prompt([], topics))
+    batches, current, used = [], [], overhead
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text) + 8  # numbering, quotes and the answer object
+        if current and used + cost > token_budget:
+            batches.append(current)
+            current, used = [], overhead
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def classify_batch(texts: list[str], topics: list[str], timeout: float = REQUEST_TIMEOUT,
+                   retries: int = MAX_RETRIES) -> list[dict | None]:
+    """Classify several texts in one call. Items that fail validation come back as None."""
+    results: list[dict | None] = [None] * len(texts)
+    prompt = get_batch_classify_prompt(texts, topics)
+    try:
+        output = generate(prompt, MODEL, timeout=timeout, retries=retries)
+        json_start = output.find("[")
+        json_end = output.rfind("]") + 1
+        parsed = json.loads(output[json_start:json_end])
+    except Exception as e:
+        logger.error(f" Batch classification of {len(texts)} segments failed: {e}")
+        return results
+
+    for item in parsed if isinstance(parsed, list) else []:
+        try:
+            idx = int(item["id"]) - 1
+            label = item["sensitivity"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= idx < len(texts) and label in VALID_LABELS and results[idx] is None:
+            results[idx] = {"sensitivity": label, "reason": item.get("reason", "No rationale provided.")}
+    return results
+
+
+def classify_segments_batched(texts: list[str], topics: list[str], token_budget: int = BATCH_TOKEN_BUDGET,
+                              max_workers: int = MAX_IN_FLIGHT, on_result=None) -> tuple[list[dict], dict]:
+    """Classify texts with multi-segment prompts, falling back to single calls per failed item.
+
+    Returns the results in input order plus stats on the LLM round-trips used.
+    """
+    cache = get_cache()
+    keys = [classify_cache_key(text, topics, batched=True) for text in texts]
+    # A label from the single-segment prompt is an equally valid answer, so reuse it when present;
+    # fallback calls below store under that key via classify_segments
+    results: list[dict | None] = [cache.get(key) or cache.get(classify_cache_key(text, topics))
+                                  for key, text in zip(keys, texts)]
+    pending = [i for i, r in enumerate(results) if r is None]
+    if on_result:
+        for i, result in enumerate(results):
+            if result is not None:
+                on_result(i, result)
+    batches = [[pending[j] for j in batch] for batch in plan_batches([texts[i] for i in pending], topics, token_budget)]
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {pool.submit(classify_batch, [texts[i] for i in batch], topics): batch for batch in batches}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Classifying (batched)"):
+            for i, result in zip(futures[future], future.result()):
+                results[i] = result
+                if result is not None:
+                    cache.put(keys[i], "classify", result)
+                    if on_result:
+                        on_result(i, result)
+
+    failed = [i for i, r in enumerate(results) if r is None]
+    if failed:
+        logger.warning(f" {len(failed)} segments failed batch validation; classifying them individually.")
+        fallback = classify_segments([texts[i] for i in failed], topics, max_workers=max_workers,
+                                     on_result=on_result and (lambda j, result: on_result(failed[j], result)))
+        for i, result in zip(failed, fallback):
+            results[i] = result
+
+    round_trips = len(batches) + len(failed)
+    stats = {
+        "segments": len(texts),
+        "batches": len(batches),
+        "fallback_calls": len(failed),
+        "round_trips": round_trips,
+        "round_trips_saved": len(texts) - round_trips,
+    }
+    logger.info(f" Batched classification used {round_trips} LLM calls for {len(texts)} segments "
+                f"({stats['round_trips_saved']} saved vs. per-segment).")
+    return results, stats
+
+
 def get_rephrase_prompt(text: str) -> str:
     return f"""
 Rephrase the following workplace sentence to be more neutral, professional, and compliant — without changing its meaning.
@@ -67,29 +238,177 @@ Return ONLY the rewritten sentence.
 """
 
 
+def rephrase_cache_key(text: str, batched: bool = False) -> str:
+    """Cache key for one rewrite, tied to the prompt template that produced it."""
+    template = get_batch_rephrase_prompt([""]) if batched else get_rephrase_prompt("")
+    return make_key("rephrase", text, [], MODEL, template_hash(template))
+
+
 def rephrase_warning_text(text: str) -> str:
+    cache = get_cache()
+    key = rephrase_cache_key(text)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
     prompt = get_rephrase_prompt(text)
     try:
-        response = requests.post(OLLAMA_URL, json={"model": MODEL, "prompt": prompt, "stream": False})
-        return response.json().get("response", "").strip()
+        rewritten = generate(prompt, MODEL).strip()
+        if rewritten:
+            cache.put(key, "rephrase", rewritten)
+        return rewritten
     except Exception as e:
         logger.error(f" Rephrase failed: {text[:40]}... => {e}")
         return "[[REDACTED]]"
 
 
-def redact_or_rephrase_segments(segments: list[dict]) -> tuple[list[dict], list[str]]:
+def get_batch_rephrase_prompt(texts: list[str]) -> str:
+    numbered = "\n".join(f'{i}. "{text}"' for i, text in enumerate(texts, start=1))
+    return f"""
+Rephrase each of the following numbered workplace sentences to be more neutral, professional, and compliant — without changing its meaning.
+
+Originals:
+{numbered}
+
+Return a JSON array ONLY, with one object per sentence, in this format:
+[
+  {{"id": 1, "text": "rewritten sentence"}}
+]
+"""
+
+
+def rephrase_batch(texts: list[str], timeout: float = REQUEST_TIMEOUT, retries: int = MAX_RETRIES) -> list[str | None]:
+    """Rephrase several sentences in one call. Items missing from the reply come back as None."""
+    results: list[str | None] = [None] * len(texts)
+    try:
+        output = generate(get_batch_rephrase_prompt(texts), MODEL, timeout=timeout, retries=retries)
+        parsed = json.loads(output[output.find("["):output.rfind("]") + 1])
+    except Exception as e:
+        logger.error(f" Batch rephrase of {len(texts)} sentences failed: {e}")
+        return results
+
+    cache = get_cache()
+    for item in parsed if isinstance(parsed, list) else []:
+        try:
+            idx = int(item["id"]) - 1
+            rewritten = str(item["text"]).strip()
+        except (KeyError, TypeError, ValueError):
+            continue
+        if 0 <= idx < len(texts) and rewritten and results[idx] is None:
+            results[idx] = rewritten
+            cache.put(rephrase_cache_key(texts[idx], batched=True), "rephrase", rewritten)
+    return results
+
+
+class Rephraser:
+    """Deduplicating rephrase queue over a bounded thread pool.
+
+    ``submit`` can be called as soon as a segment is known to be a Warning; identical
+    texts share one request. With ``batch_size`` set, sentences are grouped into
+    multi-sentence prompts, and items the model drops are retried one by one.
+    """
+
+    def __init__(self, max_workers: int = MAX_IN_FLIGHT, batch_size: int | None = None):
+        self.batch_size = batch_size if batch_size and batch_size > 1 else None
+        self.requested = 0
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="rephrase")
+        self._futures: dict[str, Future] = {}
+        self._batch: list[tuple[str, Future]] = []
+        self._lock = threading.Lock()
+
+    def prefetch(self, text: str):
+        """Start rewriting ``text`` early; the later ``submit`` for its segment reuses the request."""
+        self._submit(text, count=False)
+
+    def submit(self, text: str) -> Future:
+        return self._submit(text, count=True)
+
+    def _submit(self, text: str, count: bool) -> Future:
+        key = normalize_text(text)
+        with self._lock:
+            self.requested += count
+            future = self._futures.get(key)
+            if future is not None:
+                return future
+            cache = get_cache()
+            # As for classification, a single-prompt rewrite is reused in batch mode when present
+            cached = (self.batch_size and cache.get(rephrase_cache_key(text, batched=True))) \
+                or cache.get(rephrase_cache_key(text))
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+            elif self.batch_size:
+                future = Future()
+                self._batch.append((text, future))
+                if len(self._batch) >= self.batch_size:
+                    self._dispatch()
+            else:
+                future = self._pool.submit(rephrase_warning_text, text)
+            self._futures[key] = future
+            return future
+
+    def _dispatch(self):
+        batch, self._batch = self._batch, []
+        if batch:
+            self._pool.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: list[tuple[str, Future]]):
+        results = rephrase_batch([text for text, _ in batch])
+        for (text, future), rewritten in zip(batch, results):
+            try:
+                future.set_result(rewritten if rewritten is not None else rephrase_warning_text(text))
+            except Exception as e:
+                future.set_exception(e)
+
+    def flush(self):
+        """Send any partly filled batch now rather than waiting for it to fill."""
+        with self._lock:
+            self._dispatch()
+
+    def close(self):
+        self.flush()
+        self._pool.shutdown(wait=True)
+        if self.requested:
+            logger.info(f" Rephrased {len(self._futures)} unique sentences for {self.requested} Warning segments.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def redact_critical_text(seg: dict) -> str:
+    """Critical segments lose only their rule-matched spans when span redaction was requested."""
+    if "pii_spans" in seg:
+        from .pii_rules import redact_spans
+        return redact_spans(seg["text"], seg["pii_spans"])
+    return "[[REDACTED]]"
+
+
+def redact_or_rephrase_segments(segments: list[dict], rephraser: Rephraser | None = None,
+                                max_workers: int = MAX_IN_FLIGHT) -> tuple[list[dict], list[str]]:
+    """Redact Critical and rephrase Warning segments; rephrasing runs concurrently.
+
+    Pass the ``rephraser`` that classification already fed to reuse requests started early.
+    """
     redacted_lines = []
     counts = {"safe": 0, "warning": 0, "critical": 0}
+    own_rephraser = rephraser is None
+    rephraser = rephraser or Rephraser(max_workers)
+    rephrased = {i: rephraser.submit(seg["text"]) for i, seg in enumerate(segments)
+                 if seg.get("sensitivity", "").lower() == "warning"}
+    rephraser.flush()
 
-    for seg in segments:
+    for i, seg in enumerate(segments):
         label = seg.get("sensitivity", "").lower()
 
         if label == "critical":
-            seg["text"] = "[[REDACTED]]"
+            seg["text"] = redact_critical_text(seg)
             redacted_lines.append(seg["text"])
             counts["critical"] += 1
         elif label == "warning":
-            new_text = rephrase_warning_text(seg["text"])
+            new_text = rephrased[i].result()
             seg["text"] = new_text
             redacted_lines.append(new_text)
             counts["warning"] += 1
@@ -97,6 +416,8 @@ def redact_or_rephrase_segments(segments: list[dict]) -> tuple[list[dict], list[
             redacted_lines.append(seg["text"])
             counts["safe"] += 1
 
+    if own_rephraser:
+        rephraser.close()
     logger.info(f" Redacted: {counts['critical']}, Rephrased: {counts['warning']}, Safe: {counts['safe']}")
     return segments, redacted_lines
 
@@ -144,27 +465,285 @@ def write_redacted_text_file(lines: list[str], timestamp: str):
         logger.error(f" Failed to write redacted text: {e}")
 
 
-def enrich_and_redact_segments(transcript_path: Path, topics: list[str]):
+def classify_texts(texts: list[str], topics: list[str], max_workers: int = MAX_IN_FLIGHT,
+                   batch_token_budget: int | None = None, prefilter_threshold: float | None = None,
+                   pii_rules: str | None = None, on_result=None) -> tuple[list[dict], dict]:
+    """Run the configured triage stages, then the LLM on whatever is left, in input order.
+
+    ``pii_rules`` ("segment" or "span") labels deterministic regex/keyword hits first.
+    ``on_result(index, result)`` fires as soon as each text's label is known.
+    """
+    results: list[dict | None] = [None] * len(texts)
+    stats = {}
+
+    if pii_rules:
+        from .pii_rules import apply_rules
+        results, stats["rules"] = apply_rules(texts, topics, pii_rules)
+
+    pending = [i for i, r in enumerate(results) if r is None]
+    if prefilter_threshold is not None and pending:
+        from .embedding_filter import prefilter_segments
+        filtered, stats["prefilter"] = prefilter_segments([texts[i] for i in pending], topics, prefilter_threshold)
+        for i, result in zip(pending, filtered):
+            results[i] = result
+
+    if on_result:
+        for i, result in enumerate(results):
+            if result is not None:
+                on_result(i, result)
+
+    pending = [i for i, r in enumerate(results) if r is None]
+    pending_texts = [texts[i] for i in pending]
+    forward = on_result and (lambda j, result: on_result(pending[j], result))
+    if batch_token_budget:
+        llm_results, stats["batching"] = classify_segments_batched(pending_texts, topics, batch_token_budget,
+                                                                   max_workers=max_workers, on_result=forward)
+    else:
+        llm_results = classify_segments(pending_texts, topics, max_workers=max_workers, on_result=forward)
+    for i, result in zip(pending, llm_results):
+        results[i] = result
+    stats["llm_segments"] = len(pending)
+    return results, stats
+
+
+def plan_windows(segments: list[dict], max_tokens: int,
+                 max_gap: float = WINDOW_MAX_GAP_SECONDS) -> list[list[int]]:
+    """Group adjacent segment indices into windows of at most ``max_tokens`` with no long pause inside."""
+    windows, current, used, last_end = [], [], 0, 0.0
+    for i, seg in enumerate(segments):
+        cost = estimate_tokens(seg["text"])
+        start = parse_time(seg["start"])
+        if current and (used + cost > max_tokens or start - last_end > max_gap):
+            windows.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+        last_end = parse_time(seg["end"])
+    if current:
+        windows.append(current)
+    return windows
+
+
+def classify_segment_windows(segments: list[dict], topics: list[str], window_tokens: int | None = None,
+                             on_result=None, first_window: int = 0, **options) -> tuple[list[dict], dict]:
+    """Classify segments, merging short neighbours into context windows when ``window_tokens`` is set.
+
+    Deterministic rules still run per segment first, so a rule hit labels only the segment
+    it matched. Each window of the remaining segments is classified once and its label copied
+    to every member, whose own text and timestamps are left untouched. Windows are numbered
+    from ``first_window`` so callers classifying in batches can keep ids unique.
+    Returns one result per segment plus stats.
+    """
+    texts = [seg["text"] for seg in segments]
+    if not window_tokens:
+        return classify_texts(texts, topics, on_result=on_result, **options)
+
+    results: list[dict | None] = [None] * len(segments)
+    stats = {}
+    pii_rules = options.pop("pii_rules", None)
+    if pii_rules:
+        from .pii_rules import apply_rules
+        results, stats["rules"] = apply_rules(texts, topics, pii_rules)
+        if on_result:
+            for i, result in enumerate(results):
+                if result is not None:
+                    on_result(i, result)
+
+    # Windows only join segments that are still adjacent once rule hits are taken out
+    runs, windows = [], []
+    for i, result in enumerate(results):
+        if result is None:
+            if runs and runs[-1][-1] == i - 1:
+                runs[-1].append(i)
+            else:
+                runs.append([i])
+    for run in runs:
+        windows += [[run[k] for k in members] for members in plan_windows([segments[i] for i in run], window_tokens)]
+    pending = [i for run in runs for i in run]
+
+    def _forward(j: int, result: dict):
+        for i in windows[j]:
+            on_result(i, dict(result, window=first_window + j))
+
+    window_texts = [" ".join(texts[i] for i in members) for members in windows]
+    window_results, window_stats = classify_texts(window_texts, topics, on_result=on_result and _forward, **options)
+    stats.update(window_stats)
+    for j, (members, result) in enumerate(zip(windows, window_results)):
+        for i in members:
+            results[i] = dict(result, window=first_window + j)
+
+    saved = len(pending) - len(windows)
+    stats["windowing"] = {
+        "segments": len(segments),
+        "windows": len(windows),
+        "requests_saved": saved,
+        "reduction": round(saved / len(segments), 4) if segments else 0.0,
+    }
+    logger.info(f" Windowing merged {len(pending)} segments into {len(windows)} classification windows "
+                f"({stats['windowing']['reduction'] * 100:.1f}% fewer requests).")
+    return results, stats
+
+
+def apply_classification(seg: dict, result: dict) -> dict:
+    """Copy a classification result onto a segment, including any rule name and spans."""
+    seg["sensitivity"] = result["sensitivity"]
+    seg["rationale"] = result["reason"]
+    for key in ("rule", "pii_spans", "window"):
+        seg.pop(key, None)
+    if "rule" in result:
+        seg["rule"] = result["rule"]
+    if "spans" in result:
+        seg["pii_spans"] = result["spans"]
+    if "window" in result:
+        seg["window"] = result["window"]
+    return seg
+
+
+def rephrase_stage_inputs(batch_size: int | None = None) -> dict:
+    """Everything a rewrite depends on, as recorded in the run manifest."""
+    inputs = {"model": MODEL, "prompt": template_hash(get_rephrase_prompt(""))}
+    if batch_size:
+        inputs["batch"] = [batch_size, template_hash(get_batch_rephrase_prompt([""]))]
+    return inputs
+
+
+def normalize_topics(topics: list[str]) -> list[str]:
+    return sorted({t.strip().lower() for t in topics if t.strip()})
+
+
+def classify_stage_inputs(segments: list[dict], topics: list[str], prefilter_threshold: float | None = None,
+                          pii_rules: str | None = None, window_tokens: int | None = None) -> dict:
+    """Everything a classification depends on, as recorded in the run manifest."""
+    classifier = {"model": MODEL, "prompt": template_hash(get_classify_prompt("", [])),
+                  "prefilter_threshold": prefilter_threshold}
+    if window_tokens:
+        classifier["windows"] = [window_tokens, WINDOW_MAX_GAP_SECONDS, WINDOW_SCHEME]
+    if pii_rules:
+        from .pii_rules import rules_signature
+        classifier["pii_rules"] = [pii_rules, rules_signature(topics)]
+    return {
+        "transcript": hash_data([[seg["start"], seg["end"], seg["text"]] for seg in segments]),
+        "topics": normalize_topics(topics),
+        "classifier": classifier,
+    }
+
+
+def reclassify_for_topics(segments: list[dict], old_topics: list[str], new_topics: list[str],
+                          max_workers: int = MAX_IN_FLIGHT, batch_token_budget: int | None = None,
+                          prefilter_threshold: float | None = None, pii_rules: str | None = None,
+                          window_tokens: int | None = None) -> dict:
+    """Update existing labels in place after a topic-list edit, querying only what can change.
+
+    A removed topic may be the only reason a segment was flagged, so flagged segments are
+    re-checked against the full new list. Safe segments can only become more sensitive, so
+    they are checked against the added topics alone and keep the more severe label.
+    """
+    added = [t for t in new_topics if t not in old_topics]
+    removed = [t for t in old_topics if t not in new_topics]
+    options = {"max_workers": max_workers, "batch_token_budget": batch_token_budget,
+               "prefilter_threshold": prefilter_threshold, "pii_rules": pii_rules, "window_tokens": window_tokens}
+    # New windows are numbered after the existing ones so ids stay unique in the transcript
+    options["first_window"] = max((seg.get("window", -1) for seg in segments), default=-1) + 1
+    recheck = [i for i, seg in enumerate(segments) if seg.get("sensitivity") != "Safe"] if removed else []
+    if recheck:
+        results, stats = classify_segment_windows([segments[i] for i in recheck], new_topics, **options)
+        options["first_window"] += stats.get("windowing", {}).get("windows", 0)
+        for i, result in zip(recheck, results):
+            apply_classification(segments[i], result)
+
+    rechecked = set(recheck)
+    extend = [i for i in range(len(segments)) if i not in rechecked] if added else []
+    if extend:
+        results, _ = classify_segment_windows([segments[i] for i in extend], added, **options)
+        for i, result in zip(extend, results):
+            if SEVERITY.get(result["sensitivity"], 0) > SEVERITY.get(segments[i].get("sensitivity"), 0):
+                apply_classification(segments[i], result)
+
+    logger.info(f" Topic change: +{added} -{removed}; re-checked {len(recheck)} flagged segments against all "
+                f"topics and {len(extend)} against the added ones.")
+    return {"added_topics": added, "removed_topics": removed,
+            "rechecked_segments": len(recheck), "extended_segments": len(extend)}
+
+
+def enrich_and_redact_segments(transcript_path: Path, topics: list[str], max_workers: int = MAX_IN_FLIGHT,
+                               batch_token_budget: int | None = None, prefilter_threshold: float | None = None,
+                               output_key: str | None = None, pii_rules: str | None = None,
+                               rephrase_batch_size: int | None = None,
+                               window_tokens: int | None = None) -> list[str] | None:
+    """Classify and redact a transcript, reusing every stage whose inputs are unchanged.
+
+    Warning segments are handed to the rephraser the moment they are classified, so
+    rephrasing overlaps the rest of the classification pass.
+    Returns the names of the reused stages, or None if the transcript could not be read.
+    """
     logger.info(f" Loading transcript: {transcript_path}")
     try:
         with open(transcript_path, "r", encoding="utf-8") as f:
             data = json.load(f)
     except Exception as e:
         logger.error(f" Failed to load transcript: {e}")
-        return
+        return None
 
     segments = data.get("segments", [])
-    logger.info(f"Classifying {len(segments)} segments with topics: {topics}")
-
-    for seg in tqdm(segments, desc="Classifying"):
-        result = classify_segment(seg["text"], topics)
-        seg["sensitivity"] = result["sensitivity"]
-        seg["rationale"] = result["reason"]
-
-    timestamp = extract_timestamp_from_filename(transcript_path.name)
+    timestamp = output_key or extract_timestamp_from_filename(transcript_path.name)
+    manifest = load_manifest(timestamp)
+    inputs = classify_stage_inputs(segments, topics, prefilter_threshold, pii_rules, window_tokens)
+    previous = manifest["stages"].get("classify", {}).get("inputs", {})
+    classified_path = OUTPUT_DIR / f"classified_transcript_{timestamp}.json"
+    reused = []
+
+    rephraser = Rephraser(max_workers, rephrase_batch_size)
+
+    def _start_rephrase(i: int, result: dict):
+        if result["sensitivity"] == "Warning":
+            rephraser.prefetch(segments[i]["text"])
+
+    if stage_is_current(manifest, "classify", inputs):
+        data = load_json(classified_path)
+        reused.append("classify")
+    elif (previous.get("transcript") == inputs["transcript"] and previous.get("classifier") == inputs["classifier"]
+          and outputs_intact(manifest, "classify")):
+        # Only the topics changed: start from the previous labels
+        data = load_json(classified_path)
+        data["classification_stats"] = reclassify_for_topics(
+            data["segments"], previous["topics"], inputs["topics"], max_workers=max_workers,
+            batch_token_budget=batch_token_budget, prefilter_threshold=prefilter_threshold, pii_rules=pii_rules,
+            window_tokens=window_tokens)
+        reused.append("classify (topic changes only)")
+    else:
+        logger.info(f"Classifying {len(segments)} segments with topics: {topics} ({max_workers} in flight)")
+        results, stats = classify_segment_windows(segments, topics, window_tokens, max_workers=max_workers,
+                                                  batch_token_budget=batch_token_budget,
+                                                  prefilter_threshold=prefilter_threshold, pii_rules=pii_rules,
+                                                  on_result=_start_rephrase)
+        data["classification_stats"] = stats
+        for seg, result in zip(segments, results):
+            apply_classification(seg, result)
 
+    try:
+        reused += write_outputs(data, topics, timestamp, classify_inputs=inputs, rephraser=rephraser)
+    finally:
+        rephraser.close()
+    log_reused(timestamp, reused)
+    get_cache().log_stats()
+    return reused
+
+
+def write_outputs(data: dict, topics: list[str], timestamp: str, redacted_segments: list[dict] | None = None,
+                  classify_inputs: dict | None = None, rephraser: Rephraser | None = None) -> list[str]:
+    """Save the classified JSON, redact/rephrase it, and write the redacted JSON, text and report.
+
+    Pass ``redacted_segments`` when redaction already happened upstream to skip that step.
+    The ``rephraser``'s batch size is recorded with the redact stage inputs.
+    Each stage is recorded in the run manifest; the redact and report stages are skipped
+    when their inputs and output files are unchanged. Returns the names of reused stages.
+    """
     full_json_path = OUTPUT_DIR / f"classified_transcript_{timestamp}.json"
     redacted_json_path = OUTPUT_DIR / f"redacted_transcript_{timestamp}.json"
+    redacted_text_path = OUTPUT_DIR / f"redacted_text_{timestamp}.txt"
+    report_path = OUTPUT_DIR / f"privacy_report_{timestamp}.txt"
+    manifest = load_manifest(timestamp)
+    reused = []
 
     try:
         with open(full_json_path, "w", encoding="utf-8") as f:
@@ -172,16 +751,48 @@ def enrich_and_redact_segments(transcript_path: Path, topics: list[str]):
         logger.info(f" Full JSON saved to: {full_json_path}")
     except Exception as e:
         logger.error(f" Failed to save classified JSON: {e}")
+    if classify_inputs is not None:
+        record_stage(manifest, "classify", classify_inputs, {"classified_json": full_json_path})
 
-    redacted_data = deepcopy(data)
-    redacted_data["segments"], redacted_lines = redact_or_rephrase_segments(redacted_data["segments"])
-
-    try:
-        with open(redacted_json_path, "w", encoding="utf-8") as f:
-            json.dump(redacted_data, f, indent=2)
-        logger.info(f" Redacted JSON saved to: {redacted_json_path}")
-    except Exception as e:
-        logger.error(f" Failed to save redacted JSON: {e}")
-
-    write_redacted_text_file(redacted_lines, timestamp)
-    generate_privacy_report(redacted_data["segments"], topics, timestamp)
+    redact_inputs = {
+        "classified": hash_data([[seg["text"], seg.get("sensitivity"), seg.get("pii_spans")] for seg in data["segments"]]),
+        "rephrase": rephrase_stage_inputs(rephraser.batch_size if rephraser else None),
+    }
+    if redacted_segments is None and stage_is_current(manifest, "redact", redact_inputs):
+        redacted_data = load_json(redacted_json_path)
+        reused.append("redact")
+    else:
+        redacted_data = deepcopy(data)
+        if redacted_segments is None:
+            redacted_data["segments"], redacted_lines = redact_or_rephrase_segments(redacted_data["segments"],
+                                                                                    rephraser=rephraser)
+        else:
+            redacted_data["segments"] = redacted_segments
+            redacted_lines = [seg["text"] for seg in redacted_segments]
+        for seg in redacted_data["segments"]:
+            # Word timings carry the original wording, so they stay in the classified JSON only
+            seg.pop("words", None)
+
+        try:
+            with open(redacted_json_path, "w", encoding="utf-8") as f:
+                json.dump(redacted_data, f, indent=2)
+            logger.info(f" Redacted JSON saved to: {redacted_json_path}")
+        except Exception as e:
+            logger.error(f" Failed to save redacted JSON: {e}")
+
+        write_redacted_text_file(redacted_lines, timestamp)
+        record_stage(manifest, "redact", redact_inputs,
+                     {"redacted_json": redacted_json_path, "redacted_text": redacted_text_path})
+
+    report_inputs = {
+        "redacted": hash_data([[seg.get("sensitivity"), seg.get("rationale", "")] for seg in redacted_data["segments"]]),
+        "topics": normalize_topics(topics),
+    }
+    if stage_is_current(manifest, "report", report_inputs):
+        reused.append("report")
+    else:
+        generate_privacy_report(redacted_data["segments"], topics, timestamp)
+        record_stage(manifest, "report", report_inputs, {"privacy_report": report_path})
+
+    save_manifest(timestamp, manifest)
+    return reused
@@ -0,0 +1,83 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from utils.logger import logger
+from utils.paths import OLLAMA_URL
+
+# Connection settings shared by every Ollama caller
+MAX_IN_FLIGHT = 4          # concurrent requests allowed against the Ollama server
+REQUEST_TIMEOUT = 120      # seconds per request (connect + read)
+MAX_RETRIES = 2            # extra attempts after the first failure
+BACKOFF_BASE = 1.0         # seconds, doubled on every retry
+
+_session = None
+_session_lock = threading.Lock()
+_max_in_flight = MAX_IN_FLIGHT
+# Shared by every caller (classifier pool, rephraser pool, phrase expander), so their
+# requests together never exceed the connection pool and keep-alive keeps working
+_in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT)
+
+
+def _mount(session: requests.Session, pool_size: int):
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+
+def set_max_in_flight(limit: int):
+    """Change how many Ollama requests may run at once, process-wide (e.g. from ``--llm-workers``)."""
+    global _max_in_flight, _in_flight
+    limit = max(int(limit), 1)
+    with _session_lock:
+        if limit == _max_in_flight:
+            return
+        _max_in_flight = limit
+        _in_flight = threading.BoundedSemaphore(limit)
+        if _session is not None:
+            _mount(_session, limit)
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide keep-alive session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            _mount(session, _max_in_flight)
+            _session = session
+        return _session
+
+
+def generate(prompt: str, model: str, timeout: float = REQUEST_TIMEOUT,
+             retries: int = MAX_RETRIES, backoff: float = BACKOFF_BASE) -> str:
+    """POST a prompt to Ollama and return the raw ``response`` text.
+
+    Retries on connection errors, timeouts and non-200 replies with exponential
+    backoff. Raises the last error once all attempts are exhausted.
+    """
+    last_error = None
+    for attempt in range(retries + 1):
+        try:
+            session, slots = get_session(), _in_flight
+            with slots:
+                response = session.post(
+                    OLLAMA_URL,
+                    json={"model": model, "prompt": prompt, "stream": False},
+                    timeout=timeout,
+                )
+            if response.status_code != 200:
+                raise RuntimeError(f"Ollama returned status {response.status_code}: {response.text[:200]}")
+            return response.json().get("response", "")
+        except Exception as e:
+            last_error = e
+            if attempt < retries:
+                delay = backoff * (2 ** attempt)
+                logger.warning(f" Ollama attempt {attempt + 1} failed ({e}); retrying in {delay:.1f}s")
+                time.sleep(delay)
+    raise last_error
@@ -0,0 +1,134 @@
+import bisect
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from utils.logger import logger
+from utils.paths import PII_KEYWORDS_PATH
+from utils.json_io import load_json
+
+RULE_MODES = ("segment", "span")   # label the whole segment, or redact only the matched spans
+SEPARATOR = "\x00"                 # joins segments for the single scan; no rule can match it
+SPAN_PLACEHOLDER = "[[{rule}]]"
+
+# name -> (pattern, label, topic the rule belongs to or None for always-on PII)
+BUILTIN_RULES = {
+    "email": (r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b", "Critical", None),
+    "ssn": (r"\b\d{3}-\d{2}-\d{4}\b", "Critical", None),
+    "card_number": (r"\b(?:\d{4}[ -]){3}\d{4}\b", "Critical", None),
+    # Full groups of four, then the shorter final group most IBANs end with (NO has 15 characters)
+    "iban": (r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]{4}){2,7}(?: ?[A-Z0-9]{1,4})?\b", "Critical", None),
+    "phone": (r"(?<![\w-])(?:\+\d{1,3}[ .-]?)?(?:\(\d{3}\)|\d{3})[ .-]?\d{3}[ .-]?\d{4}\b", "Critical", None),
+    "account_number": (r"(?i:\b(?:account|acct|routing)(?: number| no\.?| #)?:? ?)\d{6,17}\b", "Critical", None),
+    # The figure must carry a currency symbol or a money unit: a bare number after "make" or
+    # "raise" is usually a time, a count or a year, and a rule hit skips the LLM entirely
+    "salary_figure": (r"(?i:\b(?:salary|paid|pay|earn(?:s|ing)?|make|makes|compensation|raise|bonus)\b"
+                      r"[^.\d\x00]{0,30}?)(?:[$€£] ?\d[\d,]*(?:\.\d+)?(?: ?(?:k|m|grand|thousand|million))?"
+                      r"|\d[\d,]*(?:\.\d+)? ?(?i:k|grand|thousand|million|dollars|euros|pounds|bucks"
+                      r"|an hour|per hour|a year|per year|per annum))\b",
+                      "Critical", "salary"),
+}
+
+
+def load_keywords(topics: list[str]) -> dict[str, list[str]]:
+    """User keyword lists for the selected topics, from ``pii_keywords.json`` ({topic: [keywords]})."""
+    wanted = {t.strip().lower() for t in topics}
+    data = load_json(PII_KEYWORDS_PATH, default={}) if PII_KEYWORDS_PATH.exists() else {}
+    return {topic.lower(): [k for k in words if k.strip()]
+            for topic, words in data.items() if topic.lower() in wanted and words}
+
+
+def rules_signature(topics: list[str]) -> str:
+    """Hash of every rule active for ``topics``; changes whenever the rule set does."""
+    rules = sorted(_active_rules(tuple(sorted(t.lower() for t in topics))))
+    keywords = sorted((t, sorted(k.lower() for k in ws)) for t, ws in load_keywords(topics).items())
+    return hashlib.sha256(repr((rules, keywords)).encode("utf-8")).hexdigest()[:16]
+
+
+def _active_rules(topics: tuple[str, ...]) -> list[tuple[str, str, str]]:
+    return [(name, pattern, label) for name, (pattern, label, topic) in BUILTIN_RULES.items()
+            if topic is None or any(topic in t for t in topics)]
+
+
+@lru_cache(maxsize=32)
+def _compile(topics: tuple[str, ...], keywords: tuple[tuple[str, tuple[str, ...]], ...]):
+    """One alternation of named groups over every rule, so each text is scanned once."""
+    rules = _active_rules(topics)
+    for topic, words in keywords:
+        # Longest first so "base salary" wins over "salary"
+        alternation = "|".join(re.escape(w).replace(r"\ ", r"[ \t]+")
+                               for w in sorted(set(words), key=len, reverse=True))
+        rules.append((f"keyword:{topic}", rf"(?i:\b(?:{alternation})\b)", "Critical"))
+    if not rules:
+        return None, []
+    combined = re.compile("|".join(f"(?P<r{i}>{pattern})" for i, (_, pattern, _) in enumerate(rules)))
+    return combined, [(name, label) for name, _, label in rules]
+
+
+def match_rules(texts: list[str], topics: list[str]) -> list[list[dict]]:
+    """Every rule hit per text as ``{"start", "end", "rule", "label"}``, from a single regex pass."""
+    keywords = tuple(sorted((t, tuple(ws)) for t, ws in load_keywords(topics).items()))
+    combined, rules = _compile(tuple(sorted(t.lower() for t in topics)), keywords)
+    hits: list[list[dict]] = [[] for _ in texts]
+    if combined is None or not texts:
+        return hits
+
+    # Scan all segments as one string and map each match back through the offsets
+    offsets, cursor = [], 0
+    for text in texts:
+        offsets.append(cursor)
+        cursor += len(text) + len(SEPARATOR)
+    for m in combined.finditer(SEPARATOR.join(texts)):
+        i = bisect.bisect_right(offsets, m.start()) - 1
+        name, label = rules[int(m.lastgroup[1:])]
+        hits[i].append({"start": m.start() - offsets[i], "end": m.end() - offsets[i], "rule": name, "label": label})
+    return hits
+
+
+def apply_rules(texts: list[str], topics: list[str], mode: str = "segment") -> tuple[list[dict | None], dict]:
+    """Label segments with deterministic rule hits; None marks segments still needing the LLM.
+
+    In "span" mode each result also carries the matched spans so redaction can replace just
+    those characters instead of the whole segment.
+    """
+    if mode not in RULE_MODES:
+        raise ValueError(f"Unknown rule mode '{mode}', expected one of {RULE_MODES}")
+    results: list[dict | None] = []
+    by_rule: dict[str, int] = {}
+    for spans in match_rules(texts, topics):
+        if not spans:
+            results.append(None)
+            continue
+        rules = sorted({s["rule"] for s in spans})
+        for rule in rules:
+            by_rule[rule] = by_rule.get(rule, 0) + 1
+        result = {
+            "sensitivity": "Critical" if any(s["label"] == "Critical" for s in spans) else "Warning",
+            "reason": f"Rule match: {', '.join(rules)}",
+            "rule": ", ".join(rules),
+        }
+        if mode == "span":
+            result["spans"] = [{k: s[k] for k in ("start", "end", "rule")} for s in spans]
+        results.append(result)
+
+    matched = sum(r is not None for r in results)
+    stats = {"segments": len(texts), "matched": matched, "by_rule": by_rule, "mode": mode}
+    logger.info(f" Rule engine labelled {matched}/{len(texts)} segments without the LLM: {by_rule or 'no hits'}")
+    return results, stats
+
+
+def redact_spans(text: str, spans: list[dict]) -> str:
+    """Replace each matched span with a placeholder naming the rule, leaving the rest intact."""
+    out, cursor = [], 0
+    for span in sorted(spans, key=lambda s: s["start"]):
+        if span["start"] < cursor:
+            continue
+        out.append(text[cursor:span["start"]])
+        out.append(SPAN_PLACEHOLDER.format(rule=span["rule"].split(":")[0].upper()))
+        cursor = span["end"]
+    out.append(text[cursor:])
+    return "".join(out)
@@ -1,8 +1,16 @@
+import time
+_import_start = time.perf_counter()
+
 from app.audio_input.Audio_Recording import AudioInputManager
 from app.audio_input.Transcriber import AudioTranscriber
-from utils.helpers import convert_mp4_to_mp3
 from app.text_input.llm_handler import enrich_and_redact_segments,extract_timestamp_from_filename
-from utils.paths import AUDIO_FILES_DIR, OUTPUT_DIR
+from app.live_redaction import LiveRedactor
+from app.batch_runner import run_batch, output_key
+from app.pipeline import run_pipeline
+from app.audio_input.audio_redaction import write_redacted_audio
+from app.job_client import JobClient
+from app.text_input.ollama_client import set_max_in_flight
+from utils.paths import AUDIO_FILES_DIR, OUTPUT_DIR, JOB_SERVER_URL
 from utils.logger import logger
 from utils.helpers import generate_segment_audit_pdf
 from utils.helpers import generate_pdf
@@ -10,48 +18,152 @@ import json
 import re
 from pathlib import Path
 import argparse
+from utils.model_registry import TIMINGS, warm_up, log_timings
+
+TIMINGS["import pipeline modules"] = time.perf_counter() - _import_start
 
 def main(args):
+    if args.batch:
+        run_batch(args.batch, args.topics, args.model_size, workers=args.asr_workers,
+                  transcribe_options={"vad": args.vad, "use_cache": not args.no_transcript_cache},
+                  classify_options={"max_workers": args.llm_workers, "batch_token_budget": args.batch_tokens,
+                                    "prefilter_threshold": args.prefilter_threshold, "pii_rules": args.pii_rules,
+                                    "rephrase_batch_size": args.rephrase_batch, "window_tokens": args.window_tokens})
+        return
+
+    if args.server and args.use_file:
+        submit_to_server(args)
+        return
+
     audio_manager = AudioInputManager()
+    key = None
 
     # Step 1: Get Audio
     if args.use_file:
         audio_path = audio_manager.accept_pre_recorded_file(args.use_file)
+        # Key on the original file, not the fresh copy, so re-runs find the previous manifest
+        key = output_key(Path(args.use_file))
     else:
+        # Load Whisper while the user is still talking
+        warm_up(args.model_size, embedder=args.prefilter_threshold is not None)
+        live = None
+        if args.live:
+            live = LiveRedactor(audio_manager, args.topics, args.model_size,
+                                on_segment=lambda seg: print(f"[{seg['start']}] {seg['redacted_text']}"))
         audio_manager.start_recording()
+        if live:
+            live.start()
         input("Recording... Press Enter to stop.\n")
         audio_path = audio_manager.stop_recording()
+        if live:
+            # Transcription and classification already ran during recording
+            transcript_path = live.stop(audio_path)
+            if transcript_path:
+                write_audit_pdf(args, extract_timestamp_from_filename(Path(audio_path).name))
+                write_audio_copy(args, audio_path, extract_timestamp_from_filename(Path(audio_path).name))
+            logger.info("Pipeline completed.")
+            return
 
     if not audio_path:
         logger.error("No audio file to process.")
         return
 
-    # Step 2: Transcribe
     transcriber = AudioTranscriber(args.model_size)
-    transcription_text = transcriber.transcribe_audio(str(audio_path))
-    transcript_path = Path(transcriber.transcription_file)
-    if not transcript_path.exists():
-        logger.error("Transcription failed or file not created.")
-        return
+    if args.long_audio:
+        # Step 2: Transcribe across the chunk process pool, then classify the whole transcript
+        transcriber.transcribe_audio(str(audio_path), long_audio=True, workers=args.asr_workers,
+                                     vad=args.vad, use_cache=not args.no_transcript_cache, transcript_name=key)
+        transcript_path = Path(transcriber.transcription_file)
+        if not transcript_path.exists():
+            logger.error("Transcription failed or file not created.")
+            return
+        # Step 3: Classify + Redact
+        enrich_and_redact_segments(transcript_path, args.topics, output_key=key, max_workers=args.llm_workers,
+                                   batch_token_budget=args.batch_tokens,
+                                   prefilter_threshold=args.prefilter_threshold, pii_rules=args.pii_rules,
+                                   rephrase_batch_size=args.rephrase_batch, window_tokens=args.window_tokens)
+        timestamp = key or extract_timestamp_from_filename(transcript_path.name)
+    else:
+        # Steps 2-3: Transcribe, classify and redact as overlapping stages
+        result = run_pipeline(audio_path, args.topics, transcriber=transcriber, output_key=key, vad=args.vad,
+                              use_cache=not args.no_transcript_cache, max_workers=args.llm_workers,
+                              batch_token_budget=args.batch_tokens,
+                              prefilter_threshold=args.prefilter_threshold, pii_rules=args.pii_rules,
+                              rephrase_batch_size=args.rephrase_batch, window_tokens=args.window_tokens)
+        if not result:
+            logger.error("Transcription failed or file not created.")
+            return
+        transcript_path = result.transcript_path
+        timestamp = result.timestamp
 
-    # Step 3: Classify + Redact
-    enrich_and_redact_segments(transcript_path, args.topics)
+    # Step 4: Optional PDF and sanitized audio
+    write_audit_pdf(args, timestamp)
+    write_audio_copy(args, audio_path, timestamp)
 
-    # Step 4: Optional PDF
+    logger.info("Pipeline completed.")
+    if args.profile_startup:
+        log_timings()
+
+
+def write_audit_pdf(args, timestamp: str):
     if args.audit_pdf:
-        timestamp = extract_timestamp_from_filename(transcript_path.name)
         redacted_json = OUTPUT_DIR / f"redacted_transcript_{timestamp}.json"
         audit_pdf = OUTPUT_DIR / f"audit_report_{timestamp}.pdf"
         generate_segment_audit_pdf(redacted_json, audit_pdf)
 
-    logger.info("Pipeline completed.")
+def submit_to_server(args):
+    """Hand the file to a running job server, which already has the models loaded."""
+    client = JobClient(args.server)
+    if not client.is_available():
+        logger.error(f"No job server reachable at {args.server}; start one with `python -m app.job_server`.")
+        return
+    options = {"vad": args.vad, "use_cache": not args.no_transcript_cache, "max_workers": args.llm_workers,
+               "batch_token_budget": args.batch_tokens, "prefilter_threshold": args.prefilter_threshold,
+               "pii_rules": args.pii_rules, "rephrase_batch_size": args.rephrase_batch,
+               "window_tokens": args.window_tokens, "redact_audio": args.redact_audio,
+               "redact_audio_warnings": args.redact_audio_warnings, "audio_format": args.audio_format}
+    job = client.submit(args.use_file, args.topics, options)
+    job = client.wait(job["id"], on_status=lambda j: logger.info(f"Job {j['id']}: {j['status']} {j['progress']}"))
+    if job["status"] != "done":
+        logger.error(f"Job {job['id']} {job['status']}: {job.get('error') or ''}")
+        return
+    for name, path in job["outputs"].items():
+        logger.info(f"  {name}: {path}")
+    if job["reused"]:
+        logger.info(f"Reused stages: {', '.join(job['reused'])}")
+    # The server names its outputs after the job, e.g. redacted_transcript_job_<id>.json
+    write_audit_pdf(args, job["key"])
+
+
+def write_audio_copy(args, audio_path, timestamp: str):
+    if args.redact_audio:
+        write_redacted_audio(audio_path, timestamp, mode=args.redact_audio,
+                             include_warning=args.redact_audio_warnings, fmt=args.audio_format)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Audio Privacy Pipeline")
     parser.add_argument("--use-file", type=str, help="Path to a pre-recorded audio file")
+    parser.add_argument("--batch", type=str, help="Directory or glob of recordings to process; skips files with existing outputs")
     parser.add_argument("--topics", nargs="+", default=["harassment", "confidential", "salary", "mental health"], help="Sensitive topics to scan for")
     parser.add_argument("--model-size", type=str, default="base", help="Whisper model size")
+    parser.add_argument("--long-audio", action="store_true", help="Transcribe in silence-aligned chunks across a process pool")
+    parser.add_argument("--asr-workers", type=int, default=None, help="Whisper worker processes for --long-audio and --batch (default: CPU count)")
+    parser.add_argument("--vad", action="store_true", help="Skip silence with an energy-based VAD pass before Whisper")
+    parser.add_argument("--no-transcript-cache", action="store_true", help="Always re-run Whisper, ignoring cached transcripts")
+    parser.add_argument("--server", nargs="?", const=JOB_SERVER_URL, default=None, help=f"Submit --use-file to a running job server (default {JOB_SERVER_URL})")
+    parser.add_argument("--live", action="store_true", help="Transcribe and redact while recording (microphone only)")
+    parser.add_argument("--llm-workers", type=int, default=4, help="Concurrent requests sent to Ollama, classification and rephrasing combined")
+    parser.add_argument("--batch-tokens", type=int, default=None, help="Pack segments into batched classifier prompts of about this many tokens")
+    parser.add_argument("--prefilter-threshold", type=float, default=None, help="Auto-label segments below this phrase similarity as Safe before the LLM")
+    parser.add_argument("--pii-rules", choices=["segment", "span"], default=None, help="Label regex/keyword PII hits without the LLM; 'span' redacts only the matched text")
+    parser.add_argument("--window-tokens", type=int, default=None, help="Classify adjacent short segments together in windows of about this many tokens")
+    parser.add_argument("--rephrase-batch", type=int, default=None, help="Rephrase this many Warning sentences per LLM prompt")
+    parser.add_argument("--profile-startup", action="store_true", help="Log import and model load times")
+    parser.add_argument("--redact-audio", choices=["mute", "bleep"], default=None, help="Also write a copy of the recording with Critical spans muted or bleeped")
+    parser.add_argument("--redact-audio-warnings", action="store_true", help="Include Warning segments in the audio redaction")
+    parser.add_argument("--audio-format", choices=["wav", "mp3"], default="wav", help="Container for the redacted audio copy")
     parser.add_argument("--audit-pdf", action="store_true", help="Generate audit PDF report")
 
     args = parser.parse_args()
+    set_max_in_flight(args.llm_workers)
     main(args)
\ No newline at end of file
@@ -1,38 +1,62 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter.scrolledtext import ScrolledText
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
 import shutil
 import threading
+import queue
 import os
-import re
 import json
 import subprocess
 import platform
 
 from app.audio_input.Audio_Recording import AudioInputManager
 from app.audio_input.Transcriber import AudioTranscriber
-from utils.helpers import convert_mp4_to_mp3
-from app.text_input.llm_handler import enrich_and_redact_segments
+from app.pipeline import run_pipeline
+from app.batch_runner import output_key
+from app.job_client import JobClient
+from app.live_redaction import LiveRedactor
 from utils.paths import AUDIO_FILES_DIR, OUTPUT_DIR
 from utils.logger import logger
+from utils.model_registry import warm_up
+
+POLL_MS = 100           # how often the Tk thread drains the event queue
+STAGE_VERBS = {"transcribe": "transcribed", "classify": "classified", "redact": "redacted"}
+
 
 class SmartRedactorApp:
+    """Tk front end. Only the Tk thread touches widgets: background work (pipeline jobs,
+    recording, live redaction) reports back by putting ``(kind, payload)`` tuples on
+    ``self.events``, which ``poll_events`` drains every ``POLL_MS``."""
+
     def __init__(self, root):
         self.root = root
         self.root.title("Smart Audio Privacy Filter")
         self.recorder = AudioInputManager(base_directory=AUDIO_FILES_DIR)
         self.transcriber = AudioTranscriber()
-        self.audio_path = None
+        # Load Whisper in the background while the user picks a file
+        warm_up(self.transcriber.model_size, embedder=False)
+        self.audio_paths: list[Path] = []
         self.is_recording = False
+        self.live = None
+
+        self.events: queue.Queue = queue.Queue()
+        # One worker, so queued files run one after another in the order they were added
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gui-job")
+        self.waiting: list[threading.Event] = []
+        self.current: threading.Event | None = None
+        self.progress = {}
 
         self.build_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.root.after(POLL_MS, self.poll_events)
 
     def build_ui(self):
-        self.file_label = tk.Label(self.root, text="1. Choose Audio File (.mp3, .wav, .mp4)")
+        self.file_label = tk.Label(self.root, text="1. Choose Audio Files (.mp3, .wav, .mp4)")
         self.file_label.pack()
-        tk.Button(self.root, text="Browse File", command=self.browse_file).pack()
+        tk.Button(self.root, text="Browse Files", command=self.browse_file).pack()
 
         self.topic_label = tk.Label(self.root, text="2. Enter Sensitive Topics (comma-separated)")
         self.topic_label.pack()
@@ -46,46 +70,72 @@ class SmartRedactorApp:
         self.stop_button = tk.Button(self.root, text="🛑 Stop Recording", command=self.stop_recording, state=tk.DISABLED)
         self.stop_button.pack(pady=2)
 
+        self.live_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.root, text="Redact live while recording", variable=self.live_var).pack()
+
         tk.Button(self.root, text="🔍 Analyze and Redact", command=self.run_pipeline).pack(pady=10)
+        self.cancel_button = tk.Button(self.root, text="✖ Cancel Current Job", command=self.cancel_job, state=tk.DISABLED)
+        self.cancel_button.pack(pady=2)
+
+        self.status_label = tk.Label(self.root, text="Idle")
+        self.status_label.pack()
 
         self.output = ScrolledText(self.root, height=20, width=100)
         self.output.pack()
 
+    def log(self, message: str):
+        self.output.insert(tk.END, message)
+        self.output.see(tk.END)
+
     def browse_file(self):
-        file_path = filedialog.askopenfilename(filetypes=[("Audio files", "*.mp3 *.wav *.mp4")])
-        if file_path:
-            self.audio_path = Path(file_path)
-            self.output.insert(tk.END, f"Selected file: {self.audio_path.name}\n")
+        file_paths = filedialog.askopenfilenames(filetypes=[("Audio files", "*.mp3 *.wav *.mp4")])
+        if file_paths:
+            self.audio_paths = [Path(p) for p in file_paths]
+            for path in self.audio_paths:
+                self.log(f"Selected file: {path.name}\n")
 
     def start_recording(self):
+        # Read widget state here, on the Tk thread; the worker only posts events back
+        live = self.live_var.get()
+        topics = [t.strip() for t in self.topic_entry.get().split(",") if t.strip()]
+        self.record_button.config(state=tk.DISABLED)
+
         def _record():
             try:
-                self.output.insert(tk.END, "Recording... Speak now.\n")
+                self.events.put(("log", "Recording... Speak now.\n"))
+                if live:
+                    self.live = LiveRedactor(self.recorder, topics, self.transcriber.model_size,
+                                             on_segment=lambda seg: self.events.put(("live_segment", seg)))
                 self.recorder.start_recording()
-                self.is_recording = True
-                self.record_button.config(state=tk.DISABLED)
-                self.stop_button.config(state=tk.NORMAL)
+                if self.live:
+                    self.live.start()
+                self.events.put(("recording", True))
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to start recording: {e}")
-        threading.Thread(target=_record).start()
+                self.live = None
+                self.events.put(("recording_failed", str(e)))
+        threading.Thread(target=_record, daemon=True).start()
 
     def stop_recording(self):
         if not self.is_recording:
             return
-
-        raw_path = self.recorder.stop_recording()
         self.is_recording = False
-        self.record_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
+        live, self.live = self.live, None
 
-        if raw_path:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            saved_path = AUDIO_FILES_DIR / f"recorded_{timestamp}.wav"
-            shutil.copy(raw_path, saved_path)
-            self.audio_path = saved_path
-            self.output.insert(tk.END, f"Recording saved: {saved_path.name}\n")
-        else:
-            self.output.insert(tk.END, "No audio recorded.\n")
+        def _stop():
+            # Joining the capture and writer threads can take a moment; keep it off the Tk thread
+            raw_path = self.recorder.stop_recording()
+            self.events.put(("recorded", raw_path))
+            if live:
+                self.events.put(("log", "Finishing live redaction...\n"))
+                transcript = live.stop(raw_path)
+                message = f"✅ Live redaction complete. Files saved in: {OUTPUT_DIR}\n" if transcript else "No speech detected.\n"
+                self.events.put(("log", message))
+        threading.Thread(target=_stop, daemon=True).start()
+
+    def show_live_segment(self, seg):
+        flag = {"Critical": "❗", "Warning": "⚠️"}.get(seg.get("sensitivity"), "")
+        self.log(f"[{seg['start']}] {flag} {seg['redacted_text']}\n")
 
     def open_file(self, path):
         try:
@@ -96,51 +146,163 @@ class SmartRedactorApp:
             else:
                 subprocess.call(["xdg-open", path])
         except Exception as e:
-            self.output.insert(tk.END, f"Failed to open file {path}: {e}\n")
+            self.log(f"Failed to open file {path}: {e}\n")
 
     def run_pipeline(self):
-        if not self.audio_path:
+        if not self.audio_paths:
             messagebox.showerror("No File", "Please upload or record an audio file first.")
             return
 
         topics = [t.strip() for t in self.topic_entry.get().split(",") if t.strip()]
-        file_ext = self.audio_path.suffix.lower()
+        for path in self.audio_paths:
+            cancel = threading.Event()
+            self.waiting.append(cancel)
+            self.executor.submit(self.process_file, path, topics, cancel)
+            self.log(f"Queued {path.name}\n")
+        self.audio_paths = []
+        self.update_status()
 
-        if file_ext == ".mp4":
-            mp3_path = self.audio_path.with_suffix(".mp3")
-            self.audio_path = convert_mp4_to_mp3(self.audio_path, mp3_path)
+    def cancel_job(self):
+        if self.current:
+            self.current.set()
+            self.log("Cancelling current job...\n")
 
-        self.output.insert(tk.END, "\nTranscribing...\n")
-        transcript_path = self.transcriber.transcribe_audio(str(self.audio_path), save_directory=AUDIO_FILES_DIR)
-
-        if not transcript_path or not Path(transcript_path).exists():
-            self.output.insert(tk.END, "Transcription failed.\n")
+    def process_file(self, audio_path: Path, topics: list[str], cancel: threading.Event):
+        """Runs on the executor thread; every UI update goes through ``self.events``."""
+        self.events.put(("started", (audio_path, cancel)))
+        try:
+            outputs = self._process(audio_path, topics, cancel)
+        except Exception as e:
+            logger.error(f"GUI job for {audio_path.name} failed: {e}")
+            self.events.put(("finished", (audio_path, None, f"Failed: {e}")))
             return
+        if cancel.is_set():
+            self.events.put(("finished", (audio_path, None, "Cancelled.")))
+        elif outputs is None:
+            self.events.put(("finished", (audio_path, None, "Transcription failed.")))
+        else:
+            self.events.put(("finished", (audio_path, outputs, None)))
+
+    def _process(self, audio_path: Path, topics: list[str], cancel: threading.Event) -> dict | None:
+        client = JobClient()
+        if client.is_available():
+            # A local job server already has the models loaded
+            job_id = client.submit(audio_path, topics)["id"]
 
-        self.output.insert(tk.END, "LLM Model is Running...\n")
-        enrich_and_redact_segments(transcript_path, topics)
+            def on_status(job):
+                self.events.put(("progress", {k: v for k, v in job["progress"].items() if k in STAGE_VERBS}))
+                if cancel.is_set() and job["status"] in ("queued", "running"):
+                    client.cancel(job_id)
+            job = client.wait(job_id, on_status=on_status)
+            if job["status"] != "done":
+                if not cancel.is_set():
+                    self.events.put(("log", f"Job {job['status']}: {job.get('error') or ''}\n"))
+                return None
+            return {name: Path(path) for name, path in job["outputs"].items()}
 
-        match = re.search(r'(\d{8}_\d{6})', str(transcript_path))
-        timestamp = match.group(1) if match else datetime.now().strftime('%Y%m%d_%H%M%S')
+        def on_event(kind, payload):
+            if kind == "segment":
+                stage, index = payload
+                self.events.put(("progress", {stage: index + 1}))
+            elif kind == "stage":
+                self.events.put(("stage", payload))
 
-        self.output.insert(tk.END, "Generating output...\n")
-        full_json = OUTPUT_DIR / f"classified_transcript_{timestamp}.json"
-        redacted_txt = OUTPUT_DIR / f"redacted_text_{timestamp}.txt"
-        summary_txt = OUTPUT_DIR / f"privacy_report_{timestamp}.txt"
+        # A key stable per file lets a re-run with other topics reuse the earlier stages
+        result = run_pipeline(audio_path, topics, transcriber=self.transcriber, save_directory=AUDIO_FILES_DIR,
+                              output_key=output_key(audio_path), on_event=on_event, cancel=cancel)
+        return result.outputs if result else None
+
+    def poll_events(self):
+        """Apply everything the background threads have posted since the last tick."""
+        try:
+            while True:
+                kind, payload = self.events.get_nowait()
+                self.handle_event(kind, payload)
+        except queue.Empty:
+            pass
+        self.root.after(POLL_MS, self.poll_events)
 
-        self.output.insert(tk.END, f"\n✅ Analysis complete. Files saved in: {OUTPUT_DIR}\n")
+    def handle_event(self, kind, payload):
+        if kind == "log":
+            self.log(payload)
+        elif kind == "live_segment":
+            self.show_live_segment(payload)
+        elif kind == "recording":
+            self.is_recording = True
+            self.stop_button.config(state=tk.NORMAL)
+        elif kind == "recording_failed":
+            self.record_button.config(state=tk.NORMAL)
+            messagebox.showerror("Error", f"Failed to start recording: {payload}")
+        elif kind == "recorded":
+            self.record_button.config(state=tk.NORMAL)
+            self.save_recording(payload)
+        elif kind == "started":
+            audio_path, cancel = payload
+            if cancel in self.waiting:
+                self.waiting.remove(cancel)
+            self.current, self.progress = cancel, {"file": audio_path.name}
+            self.cancel_button.config(state=tk.NORMAL)
+            self.log(f"\nTranscribing and classifying {audio_path.name}...\n")
+        elif kind == "progress":
+            self.progress.update(payload)
+        elif kind == "stage" and payload == ("outputs", "started"):
+            self.progress["writing"] = True
+        elif kind == "finished":
+            audio_path, outputs, message = payload
+            self.current, self.progress = None, {}
+            self.cancel_button.config(state=tk.DISABLED)
+            if outputs is None:
+                self.log(f"{audio_path.name}: {message}\n")
+            else:
+                self.show_outputs(outputs)
+        self.update_status()
+
+    def update_status(self):
+        parts = []
+        if self.progress:
+            counts = ", ".join(f"{verb} {self.progress[stage]}" for stage, verb in STAGE_VERBS.items()
+                               if stage in self.progress)
+            parts.append(f"{self.progress['file']}: {counts or 'starting'}"
+                         + (" — writing outputs" if self.progress.get("writing") else ""))
+        if self.waiting:
+            parts.append(f"{len(self.waiting)} queued")
+        self.status_label.config(text=" | ".join(parts) or "Idle")
+
+    def save_recording(self, raw_path):
+        if raw_path:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            saved_path = AUDIO_FILES_DIR / f"recorded_{timestamp}.wav"
+            shutil.copy(raw_path, saved_path)
+            self.audio_paths = [saved_path]
+            self.log(f"Recording saved: {saved_path.name}\n")
+        else:
+            self.log("No audio recorded.\n")
+
+    def show_outputs(self, outputs: dict):
+        full_json = outputs["classified_json"]
+        redacted_txt = outputs["redacted_text"]
+        summary_txt = outputs["privacy_report"]
+
+        self.log(f"\n✅ Analysis complete. Files saved in: {OUTPUT_DIR}\n")
         found_any = False
         for file in [full_json, redacted_txt, summary_txt]:
             if file.exists():
-                self.output.insert(tk.END, f"- {file.name}\n")
+                self.log(f"- {file.name}\n")
                 btn = tk.Button(self.root, text=f"Open {file.name}", command=lambda f=file: self.open_file(f))
                 btn.pack()
                 found_any = True
 
         if not found_any:
-            self.output.insert(tk.END, "No output files found. Check processing steps.\n")
+            self.log("No output files found. Check processing steps.\n")
+
+    def close(self):
+        for cancel in self.waiting + ([self.current] if self.current else []):
+            cancel.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = SmartRedactorApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
@@ -1,3 +1,3 @@
-from .helpers import format_time
+from .helpers import format_time, parse_time
 
-__all__ = ["format_time"]
+__all__ = ["format_time", "parse_time"]
@@ -0,0 +1,49 @@
+"""Compare WAV size and decode time for 44.1 kHz vs 16 kHz mono recordings.
+
+Usage: python -m utils.bench_capture [seconds]
+"""
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from app.audio_input.decoder import decode_audio
+
+
+def _write_wav(path: Path, rate: int, seconds: float):
+    t = np.arange(int(rate * seconds)) / rate
+    # Speech-band tones with a slow amplitude envelope
+    signal = (np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 1800 * t)) * (0.5 + 0.5 * np.sin(2 * np.pi * 0.3 * t))
+    pcm = (signal / 1.5 * 12000).astype(np.int16)
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm.tobytes())
+
+
+def main(seconds: float = 300.0):
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for rate in (44100, 16000):
+            path = Path(tmp) / f"bench_{rate}.wav"
+            _write_wav(path, rate, seconds)
+            start = time.perf_counter()
+            audio = decode_audio(path)
+            elapsed = time.perf_counter() - start
+            results[rate] = (path.stat().st_size, elapsed, len(audio))
+
+    print(f"{seconds:.0f}s of mono audio")
+    for rate, (size, elapsed, samples) in results.items():
+        print(f"  {rate:>5} Hz: {size / 1e6:7.2f} MB on disk, decode to 16 kHz in {elapsed * 1000:7.1f} ms ({samples} samples)")
+    size_hi, time_hi, _ = results[44100]
+    size_lo, time_lo, _ = results[16000]
+    print(f"  16 kHz capture: {size_hi / size_lo:.2f}x smaller, {time_hi / max(time_lo, 1e-9):.1f}x faster to decode")
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 300.0)
@@ -1,5 +1,3 @@
-from fpdf import FPDF
-import ffmpeg
 import sys
 import json
 from pathlib import Path
@@ -13,8 +11,17 @@ def format_time(seconds):
     millis = int((seconds - int(seconds)) * 1000)
     return f"{minutes:02}:{secs:02}.{millis:03}"
 
+def parse_time(value) -> float:
+    """Inverse of format_time: 'MM:SS.mmm' (or a number) to seconds."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    minutes, _, secs = str(value).partition(":")
+    return int(minutes) * 60 + float(secs) if secs else float(minutes)
+
 #Utility to generate PDF from text
 def generate_pdf(text: str, output_path: Path):
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -25,6 +32,8 @@ def generate_pdf(text: str, output_path: Path):
 
 # Utility to convert mp4 to mp3
 def convert_mp4_to_mp3(input_path: Path, output_path: Path):
+    import ffmpeg
+
     try:
         ffmpeg.input(str(input_path)).output(str(output_path), format='mp3', acodec='libmp3lame').run(overwrite_output=True, quiet=True)
         return output_path
@@ -34,6 +43,8 @@ def convert_mp4_to_mp3(input_path: Path, output_path: Path):
 
 # Generate audit PDF from classified JSON
 def generate_segment_audit_pdf(json_path: Path, output_pdf: Path):
+    from fpdf import FPDF
+
     try:
         with open(json_path, "r", encoding="utf-8") as f:
             data = json.load(f)
@@ -0,0 +1,70 @@
+import hashlib
+import json
+from pathlib import Path
+
+from utils.logger import logger
+from utils.paths import OUTPUT_DIR
+from utils.json_io import load_json, save_json
+
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def hash_data(obj) -> str:
+    """SHA-256 of a JSON-serialisable value, independent of key order."""
+    payload = json.dumps(obj, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def hash_file(path) -> str | None:
+    path = Path(path)
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path(key: str) -> Path:
+    return OUTPUT_DIR / f"manifest_{key}.json"
+
+
+def load_manifest(key: str) -> dict:
+    """Per-run record of every stage: the hashes of its inputs and of the files it wrote."""
+    path = manifest_path(key)
+    manifest = load_json(path, default={"stages": {}}) if path.exists() else {"stages": {}}
+    manifest.setdefault("stages", {})
+    return manifest
+
+
+def save_manifest(key: str, manifest: dict):
+    save_json(manifest_path(key), manifest)
+
+
+def outputs_intact(manifest: dict, stage: str) -> bool:
+    """True if the stage ran before and none of its output files have changed since."""
+    entry = manifest["stages"].get(stage)
+    if not entry:
+        return False
+    return all(hash_file(out["path"]) == out["sha256"] for out in entry["outputs"].values())
+
+
+def stage_is_current(manifest: dict, stage: str, inputs: dict) -> bool:
+    """True if the stage's recorded inputs match ``inputs`` and its outputs are intact."""
+    entry = manifest["stages"].get(stage)
+    return bool(entry) and entry["inputs"] == inputs and outputs_intact(manifest, stage)
+
+
+def record_stage(manifest: dict, stage: str, inputs: dict, outputs: dict[str, Path]):
+    manifest["stages"][stage] = {
+        "inputs": inputs,
+        "outputs": {name: {"path": str(path), "sha256": hash_file(path)} for name, path in outputs.items()},
+    }
+
+
+def log_reused(key: str, reused: list[str]):
+    if reused:
+        logger.info(f"Reused unchanged stages for {key}: {', '.join(reused)}")
+    else:
+        logger.info(f"No reusable stages for {key}; all stages recomputed.")
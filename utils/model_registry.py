@@ -0,0 +1,93 @@
+import importlib
+import threading
+import time
+from utils.logger import logger
+
+# Shared, lazily-loaded model instances keyed by name (e.g. "whisper:base")
+_models = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+# Seconds spent importing modules and loading models, keyed by label
+TIMINGS = {}
+
+EMBEDDER_NAME = "all-MiniLM-L6-v2"
+
+
+def timed_import(module_name: str):
+    """Import a module, recording how long the first import took."""
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    TIMINGS.setdefault(f"import {module_name}", time.perf_counter() - start)
+    return module
+
+
+def get_model(name: str, loader):
+    """Return the shared instance for ``name``, calling ``loader()`` on first use only."""
+    if name in _models:
+        return _models[name]
+    with _registry_lock:
+        lock = _locks.setdefault(name, threading.Lock())
+    with lock:
+        if name not in _models:
+            start = time.perf_counter()
+            _models[name] = loader()
+            TIMINGS[f"load {name}"] = time.perf_counter() - start
+            logger.info(f" Loaded model '{name}' in {TIMINGS[f'load {name}']:.2f}s")
+    return _models[name]
+
+
+def is_loaded(name: str) -> bool:
+    return name in _models
+
+
+def use_lock(name: str) -> threading.Lock:
+    """Lock for models that are not safe to run from several threads at once (Whisper's decoder
+    installs hooks on the shared module for the duration of each call)."""
+    with _registry_lock:
+        return _locks.setdefault(f"use:{name}", threading.Lock())
+
+
+def whisper_lock(model_size: str = "base") -> threading.Lock:
+    return use_lock(f"whisper:{model_size}")
+
+
+def get_whisper(model_size: str = "base"):
+    def _load():
+        whisper = timed_import("whisper")
+        return whisper.load_model(model_size)
+    return get_model(f"whisper:{model_size}", _load)
+
+
+def get_embedder():
+    def _load():
+        sentence_transformers = timed_import("sentence_transformers")
+        return sentence_transformers.SentenceTransformer(EMBEDDER_NAME)
+    return get_model(f"embedder:{EMBEDDER_NAME}", _load)
+
+
+def warm_up(whisper_size: str | None = "base", embedder: bool = True, background: bool = True):
+    """Load the requested models ahead of time, optionally on a daemon thread."""
+    def _run():
+        try:
+            if whisper_size:
+                get_whisper(whisper_size)
+            if embedder:
+                get_embedder()
+        except Exception as e:
+            logger.error(f" Model warm-up failed: {e}")
+
+    if not background:
+        _run()
+        return None
+    thread = threading.Thread(target=_run, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def log_timings():
+    if not TIMINGS:
+        logger.info(" No models imported or loaded yet.")
+        return
+    for label, seconds in sorted(TIMINGS.items(), key=lambda kv: -kv[1]):
+        logger.info(f" Startup cost — {label}: {seconds:.2f}s")
@@ -13,10 +13,22 @@ OUTPUT_DIR = PROJECT_ROOT / "Outputs"
 # Phrase generation and embeddings
 PHRASE_DIR = AUDIO_DATA_DIR / "Embeddings"
 PHRASE_BANK_PATH = PHRASE_DIR / "phrase_bank.json"
-EMBED_CACHE_PATH = PHRASE_DIR / "phrase_embeddings.json"
+EMBED_CACHE_PATH = PHRASE_DIR / "phrase_embeddings.json"  # legacy JSON index, migrated on load
+EMBED_MATRIX_PATH = PHRASE_DIR / "phrase_embeddings.npy"
+EMBED_META_PATH = PHRASE_DIR / "phrase_embeddings_meta.json"
+# Transcripts keyed by audio content hash + decode options
+TRANSCRIPT_CACHE_DIR = AUDIO_DATA_DIR / "transcript_cache"
+# Shared on-disk cache of LLM classify/rephrase results
+LLM_CACHE_PATH = AUDIO_DATA_DIR / "llm_cache.sqlite"
+# User keyword lists per topic for the rule-based fast path: {"topic": ["keyword", ...]}
+PII_KEYWORDS_PATH = AUDIO_DATA_DIR / "pii_keywords.json"
+
+# Uploads and per-job files for the local job server
+JOBS_DIR = AUDIO_DATA_DIR / "jobs"
+JOB_SERVER_URL = "http://127.0.0.1:8765"
 
 # Ollama API URL
 OLLAMA_URL = "http://localhost:11434/api/generate"
 # Ensure all folders exist
-for path in [AUDIO_DATA_DIR, AUDIO_FILES_DIR, TEMP_DIR, LOGS_DIR,PHRASE_DIR,OUTPUT_DIR]:
+for path in [AUDIO_DATA_DIR, AUDIO_FILES_DIR, TEMP_DIR, LOGS_DIR,PHRASE_DIR,OUTPUT_DIR,TRANSCRIPT_CACHE_DIR,JOBS_DIR]:
     path.mkdir(parents=True, exist_ok=True)